@@ -1,14 +1,33 @@
 import os
 import json
 import logging
-import yaml
+import tempfile
+import time
 import pandas as pd  # Import pandas first
 from pandas.errors import SettingWithCopyWarning
-from pypdf import PdfReader  # Pure Python PDF library (iOS a-Shell compatible)
 import numpy as np
-import re
 import warnings
 
+from bill_profile import profile_stage
+from bill_engine import (  # noqa: F401 - re-exported for existing callers
+    CHARGE_COLUMNS,
+    BillDocument,
+    BillSummary,
+    MemberCharge,
+    cents_to_dollars,
+    find_nth_occurrence,
+    format_cents,
+    get_bill_issue_date,
+    get_bill_month,
+    get_cents_from_str,
+    get_total_from_bill,
+    locate_summary_page,
+    parse_summary_table,
+    parse_table_row,
+    read_yaml_file,
+    split_cents,
+)
+
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 warnings.filterwarnings("ignore", category=SettingWithCopyWarning)
 
@@ -19,221 +38,138 @@ logging.basicConfig(
 )
 
 
-def read_yaml_file(file_path):
-    """Reads and parses a YAML file."""
-    logging.info(f"Reading YAML file from {file_path}")
-    try:
-        with open(file_path, "r") as file:
-            data = yaml.safe_load(file)
-            logging.info("YAML file read successfully")
-            return data
-    except (yaml.YAMLError, FileNotFoundError) as e:
-        logging.error(f"Error reading YAML file: {e}")
-        return None
-
-
-def find_nth_occurrence(strings: list, target: str, n: int = 1) -> int:
-    """Return index of nth occurrence of target string in strings list.
-
-    Args:
-        strings: List of strings to search
-        target: String to find
-        n: Occurrence number (1-based)
-
-    Returns:
-        Index of nth occurrence or -1 if not found
-
-    Example:
-        >>> find_nth_occurrence(["a", "b", "a", "c", "a"], "a", 3)
-        4
-    """
-    count = 0
-    for i, s in enumerate(strings):
-        if s == target:
-            count += 1
-            if count == n:
-                return i
-    return -1
-
-
-def get_num_from_str(s: str) -> float:
-    r"""Convert currency strings to floats while handling edge cases.
-
-    Examples:
-        get_num_from_str("-$280.83") → -280.83
-        get_num_from_str("$1,234.56") → 1234.56
-        get_num_from_str("-") → 0.0
-    """
-    match = re.search(r"[-+]?\$?\d{1,4}(?:,\d{3})*(\.\d+)?", str(s))
-
-    if s == "-":
-        return 0.0
+RAW_COLUMNS = ["cell_nums", "line_type", *CHARGE_COLUMNS, "is_included"]
 
-    if not match:
-        return s
 
-    try:
-        # Remove non-numeric chars except . and -
-        cleaned = re.sub(r"[^\d.-]", "", match.group(0))
-        return float(cleaned)
-    except (ValueError, TypeError):
-        return s
-
-
-def get_bill_month(reader, page_number=0):
-    """
-    Extracts the billing month from the specified page of the PDF document.
-    Looks for the text after "Here's your bill for ".
+def bill_lines_to_dataframe(lines) -> pd.DataFrame:
+    """Convert parsed BillLine rows to the raw summary table DataFrame.
 
     Args:
-        reader: pypdf PdfReader object
-        page_number: Page number to extract from (default: 0)
+        lines: BillLine rows from parse_summary_table(), Account row included
 
     Returns:
-        str: Billing month string if found, else None
+        pd.DataFrame: One row per line with RAW_COLUMNS; charges in integer
+        cents, line types as printed
     """
-    page = reader.pages[page_number]
-    text = page.extract_text()
-    match = re.search(r"Here's your bill for\s+([^\n]+)", text)
-    if match:
-        bill_month = match.group(1).strip()[:-1]  # Remove trailing period and spaces
-        # save month name to a txt file
-        with open("billing_month.txt", "w") as f:
-            f.write(bill_month)
-        logging.info(f"Billing month extracted: {bill_month}")
-    else:
-        logging.error("Billing month not found in the document")
-        return None
-
-
-def parse_table_row(row):
-    """Parse a single table row from pypdf extracted text.
+    return pd.DataFrame(
+        [
+            (line.cell_num, str(line.line_type))
+            + tuple(getattr(line, column) for column in CHARGE_COLUMNS)
+            + (line.included,)
+            for line in lines
+        ],
+        columns=RAW_COLUMNS,
+    )
 
-    Args:
-        row: Single line string from the bill summary table
 
-    Returns:
-        list: Parsed row with 7 elements [cell_nums, line_type, plans, equipment, services, one_time, total]
-        None if parsing fails
-    """
-    if row.startswith("Account"):
-        # Account row: "Account $280.00 - $0.00 - $280.00"
-        parts = row.split()
-        if len(parts) >= 6:
-            return ["Account", "", parts[1], parts[2], parts[3], parts[4], parts[5]]
-    else:
-        # Member row: "(999) 637-3009 Voice Included - - $0.53 $0.53"
-        # Extract phone number and parse rest
-        match = re.match(r"\((\d+)\)\s*(\d+)-(\d+)\s+Voice\s+(.+)", row)
-        if match:
-            phone = f"({match.group(1)}) {match.group(2)}-{match.group(3)}"
-            rest = match.group(4).strip()
-
-            # Parse remaining fields: Plans Equipment Services One-time Total
-            tokens = rest.split()
-            if len(tokens) >= 5:
-                return [phone, "Voice"] + tokens
-    return None
-
-
-def get_summary_table_from_pdf(path, page_number, family_cnt) -> pd.DataFrame:
+def get_summary_table_from_pdf(document, page_number, family_cnt) -> pd.DataFrame:
     """Extracts and structures the billing summary table from a specific PDF page.
 
     Processes T-Mobile PDF bills to locate and parse the account summary table containing
-    plan charges, equipment fees, and total amounts.
+    plan charges, equipment fees, and total amounts. The rows are read with
+    parse_summary_table(), the same parser as the default engine.
 
     Args:
-        path: Path to PDF file containing phone bill
+        document: BillDocument for the bill
         page_number: Zero-based page index containing summary table (typically page 1)
         family_cnt: Number of family members in the plan, used to validate table
 
     Returns:
         pd.DataFrame: Structured table with columns:
             - cell_nums: Phone numbers/device identifiers
-            - line_type: Voice
+            - line_type: Line type words (Voice, Mobile Internet...)
             - plans: Monthly plan charges
             - equipment: Device payment plans
             - services: Add-on services
             - one_time_charges: Non-recurring fees
             - total: Line item total
+            - is_included: Plan covered by the account plan
         Returns None if extraction fails
 
     Note:
-        - Requires exact page structure matching T-Mobile's billing format
         - Logs extraction errors with full traceback for debugging
         - Uses pypdf for pure Python PDF parsing (iOS a-Shell compatible)
     """
     try:
-        reader = PdfReader(path)
-        logging.info(f"Getting summary table from page {page_number} of PDF")
-
-        # Extract billing month from first page
-        get_bill_month(reader, 0)
-
-        # Select the page for table extraction
-        page = reader.pages[page_number]
-
-        # Extract text
-        text = page.extract_text()
-
-        # Split text into lines and process
-        lines = text.split("\n")
-        data = [line.strip() for line in lines if line.strip() != ""]
-
-        # Find the table boundaries
-        # Table starts after "THIS BILL SUMMARY" header line
-        # Table ends at "DETAILED CHARGES"
-        try:
-            summary_idx = data.index("THIS BILL SUMMARY")
-            detailed_idx = data.index("DETAILED CHARGES")
-        except ValueError as e:
-            logging.error(f"Could not find table boundaries: {e}")
+        lines = parse_summary_table(document, page_number, family_cnt)
+        if lines is None:
             return None
 
-        # Extract table rows (skip header row with column names)
-        table_lines = data[summary_idx + 2 : detailed_idx]  # +2 to skip header row
-
-        # Parse each row
-        parsed_rows = []
-        for line in table_lines:
-            if line.startswith("T otals"):  # Skip totals row
-                continue
-            parsed = parse_table_row(line)
-            if parsed:
-                parsed_rows.append(parsed)
-
-        # Validate we got the expected number of rows
-        expected_rows = family_cnt + 1  # family members + Account row
-        if len(parsed_rows) != expected_rows:
-            logging.warning(
-                f"Expected {expected_rows} rows but got {len(parsed_rows)}. "
-                f"Check family_count config setting."
-            )
-
-        # Create DataFrame
-        raw_df = pd.DataFrame(
-            parsed_rows,
-            columns=[
-                "cell_nums",
-                "line_type",
-                "plans",
-                "equipment",
-                "services",
-                "one_time_charges",
-                "total",
-            ],
-        )
-
         logging.info(
-            f"Summary table successfully extracted from PDF ({len(parsed_rows)} rows)"
+            f"Summary table successfully extracted from PDF ({len(lines)} rows)"
         )
-        return raw_df
+        return bill_lines_to_dataframe(lines)
 
     except Exception as e:
         logging.error(f"Error extracting summary table from PDF: {e}", exc_info=True)
         return None
 
 
+# Lookup table: code point -> allowed in an amount cell (zero is padding)
+_CURRENCY_CHARS = np.zeros(128, dtype=bool)
+_CURRENCY_CHARS[[0] + [ord(c) for c in "0123456789.,$+-"]] = True
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
+def normalize_currency_column(column):
+    """Convert a whole column of summary table cells to integer cents.
+
+    Vectorized counterpart of get_cents_from_str. The cells are laid out as a
+    NumPy matrix of code points (one row per cell), and digits, decimal point
+    and sign are decoded with array operations over the whole column at once,
+    with the same rounding of extra decimal places (half away from zero).
+    "-" becomes 0 and "Included" becomes 0 with its row flagged in the mask.
+
+    Args:
+        column: Series of cell strings such as "$40.00", "-$21.25", "-"
+
+    Returns:
+        tuple: (int64 Series of cents, bool Series marking "Included" cells)
+
+    Raises:
+        ValueError: If a cell is not an amount, "-" or "Included"
+    """
+    values = column.to_numpy(dtype=str)
+    width = values.dtype.itemsize // 4
+    # UCS-4 strings viewed as a (cells, max length) matrix of code points
+    chars = values.view(np.uint32).reshape(len(values), width)
+    if (chars == ord(" ")).any():
+        values = np.char.strip(values)
+        width = values.dtype.itemsize // 4
+        chars = values.view(np.uint32).reshape(len(values), width)
+
+    is_included = values == "Included"
+    is_empty = (values == "-") | is_included
+    chars = np.where(is_empty[:, None], 0, chars)  # zero is padding
+    digit = (chars >= ord("0")) & (chars <= ord("9"))
+    after_dot = np.cumsum(chars == ord("."), axis=1, dtype=np.int8)
+    allowed = _CURRENCY_CHARS[np.minimum(chars, 127)] & (chars < 128)
+    invalid = (
+        ~allowed.all(axis=1) | (after_dot[:, -1] > 1) | ~digit.any(axis=1)
+    ) & ~is_empty
+    if invalid.any():
+        raise ValueError(f"Invalid currency value: {str(values[invalid][0])!r}")
+
+    numbers = np.where(digit, chars - ord("0"), 0).astype(np.int64)
+    whole = digit & (after_dot == 0)
+    # each whole digit is weighted by 10 ** (whole digits to its right)
+    places = np.cumsum(whole[:, ::-1], axis=1, dtype=np.int8)[:, ::-1] - whole
+    cents = (numbers * whole * _POWERS_OF_TEN[places]).sum(axis=1) * 100
+
+    # fraction digits are ranked 1, 2, 3... after the decimal point
+    fraction_rank = np.cumsum(digit & (after_dot > 0), axis=1, dtype=np.int8)
+    fraction_rank *= digit & (after_dot > 0)
+    cents += (numbers * (fraction_rank == 1)).sum(axis=1) * 10
+    cents += (numbers * (fraction_rank == 2)).sum(axis=1)
+    cents += (numbers * (fraction_rank == 3)).sum(axis=1) >= 5  # half away from zero
+    cents = np.where(chars[:, 0] == ord("-"), -cents, cents)
+
+    return (
+        pd.Series(cents, index=column.index, dtype="int64"),
+        pd.Series(is_included, index=column.index),
+    )
+
+
 def process_text_to_dataframe(df, plan_cost_for_all_members):
     """Processes raw billing table into member-specific charges with cost allocation.
 
@@ -243,11 +179,13 @@ def process_text_to_dataframe(df, plan_cost_for_all_members):
     2. Charge included members shared cost and others individual plans
 
     Args:
-        df: Raw DataFrame from get_summary_table_from_pdf()
+        df: Raw DataFrame from get_summary_table_from_pdf(), or a table of
+            cells as printed on the bill (converted with
+            normalize_currency_column())
         plan_cost_for_all_members: Boolean config flag from YAML
 
     Returns:
-        pd.DataFrame: Finalized bill with columns ['member', 'total']
+        pd.DataFrame: Finalized bill with amounts in integer cents and columns
             - member: Phone number or mapped name
             - total: Calculated amount owed
             - plan_price: Plan cost per member
@@ -263,18 +201,23 @@ def process_text_to_dataframe(df, plan_cost_for_all_members):
         return None
 
     try:
-        # fix all numbers
-        currency_cols = ["plans", "equipment", "services", "one_time_charges", "total"]
-        for col in currency_cols:
-            df[col] = df[col].apply(get_num_from_str)
-        df["cell_nums"] = df["cell_nums"].apply(lambda x: x.replace("\xa0", " "))
+        if "is_included" not in df:
+            # cells as printed on the bill: fix all numbers (integer cents);
+            # only plans may say "Included"
+            for col in CHARGE_COLUMNS:
+                df[col], is_included = normalize_currency_column(df[col])
+                if col == "plans":
+                    df["is_included"] = is_included
+                elif is_included.any():
+                    raise ValueError(f"Unexpected 'Included' charge in {col}")
+        df["cell_nums"] = df["cell_nums"].str.replace("\xa0", " ", regex=False)
 
         if "Account" not in df["cell_nums"].values:
             logging.error("Missing 'Account' row in input table")
             raise ValueError("Invalid table format - no account summary row")
 
         # fix plans
-        included_members = df[df["plans"] == "Included"].shape[0]
+        included_members = int(df["is_included"].sum())
         account_row = df[df["cell_nums"] == "Account"].iloc[0]
         plan_price_for_members = account_row["plans"]
         account_equipment = account_row["equipment"]
@@ -282,28 +225,31 @@ def process_text_to_dataframe(df, plan_cost_for_all_members):
         account_one_time = account_row["one_time_charges"]
 
         df = df[df["cell_nums"] != "Account"].copy()
-        plan_price_for_others = df.loc[df["plans"] != "Included", "plans"].sum()
-        other_members = df.loc[df["plans"] != "Included", "plans"].shape[0]
+        included = df["is_included"]
+        plan_price_for_others = int(df.loc[~included, "plans"].sum())
+        other_members = df.loc[~included, "plans"].shape[0]
         total_members = included_members + other_members
 
         if plan_cost_for_all_members:
             # get the total plan cost
             total_plan_price = plan_price_for_members + plan_price_for_others
-            total_plan_price = total_plan_price / total_members
 
-            # set this plan price for all members
-            df["plan_price"] = total_plan_price
+            # split it equally, remainder cents going to the first members
+            df["plan_price"] = split_cents(total_plan_price, total_members)
         else:  # included members pay different than other members
-            df["plan_price"] = np.where(
-                df["plans"] == "Included",
-                plan_price_for_members / included_members,
-                df["plans"],
-            )
+            df["plan_price"] = np.where(included, 0, df["plans"]).astype("int64")
+            if included_members:
+                df.loc[included, "plan_price"] = split_cents(
+                    plan_price_for_members, included_members
+                )
 
         # Distribute account-level charges equally among all members
-        df["equipment"] += account_equipment / total_members
-        df["services"] += account_services / total_members
-        df["one_time_charges"] += account_one_time / total_members
+        for col, amount in [
+            ("equipment", account_equipment),
+            ("services", account_services),
+            ("one_time_charges", account_one_time),
+        ]:
+            df[col] = df[col].astype("int64") + split_cents(amount, total_members)
 
         df = df[
             ["cell_nums", "plan_price", "equipment", "services", "one_time_charges"]
@@ -329,7 +275,7 @@ def process_text_to_dataframe(df, plan_cost_for_all_members):
             ]
         ].reset_index(drop=True)
 
-        logging.info(f"Total bill sums up to ${df.total.sum():,.2f}")
+        logging.info(f"Total bill sums up to {format_cents(int(df.total.sum()))}")
         return df
     except KeyError as e:
         logging.error(f"Missing required column: {e}")
@@ -339,81 +285,168 @@ def process_text_to_dataframe(df, plan_cost_for_all_members):
         raise ValueError("Invalid table format - account plan price missing") from e
 
 
-def get_total_from_bill(path, page_number=0):
-    """Extract the total due amount from the PDF bill.
+def verify_bill_total(df, total_bill_raw):
+    """Check that the allocated member totals add up to the billed total.
 
     Args:
-        path: Path to PDF file
-        page_number: Page number to extract from (default: 0)
+        df: Processed DataFrame from process_text_to_dataframe()
+        total_bill_raw: Total due from get_total_from_bill()
 
-    Returns:
-        float: Total bill amount
+    Raises:
+        AssertionError: If the totals differ
     """
-    reader = PdfReader(path)
+    total_bill_processed = int(df.total.sum())
+    assert total_bill_processed == total_bill_raw, (
+        f"Total bill does not match: {format_cents(total_bill_processed)} "
+        f"!= {format_cents(total_bill_raw)}"
+    )
 
-    # Select the page
-    page = reader.pages[page_number]
 
-    # Extract text
-    text = page.extract_text()
+def to_dollars(df, columns=None):
+    """Return a copy of a processed DataFrame with cent columns in dollars.
 
-    # Split text into lines and process
-    lines = text.split("\n")
-    data = [line for line in lines if line.strip() != ""]
-    total_idx = find_nth_occurrence(data, "TOTAL DUE", 1)
-    return get_num_from_str(data[total_idx + 1])
+    Used for CSV exports, which stay human-readable while all arithmetic is
+    done in integer cents.
+
+    Args:
+        df: DataFrame with amounts in integer cents
+        columns: Columns to convert (default: the processed member columns)
+    """
+    df = df.copy()
+    if columns is None:
+        columns = ["total", "plan_price", "equipment", "services", "one_time_charges"]
+    for col in columns:
+        df[col] = df[col].map(cents_to_dollars)
+    return df
 
 
 def save_dataframe(df, file_path):
     """Saves DataFrame to a CSV file."""
     try:
-        df.to_csv(file_path, index=False)
+        with profile_stage("output"):
+            df.to_csv(file_path, index=False)
         logging.info(f"DataFrame saved successfully to {file_path}")
     except Exception as e:
         logging.error(f"Error saving DataFrame: {e}")
 
 
-def main(pdf_path=None):
+def make_run_dir(root) -> str:
+    """Create a new directory for the exports of one run.
+
+    Named after the start time plus a random suffix, so concurrent runs never
+    write to the same files.
+
+    Args:
+        root: Directory the run directories are created in
+
+    Returns:
+        str: Path of the new run directory
+    """
+    os.makedirs(root, exist_ok=True)
+    return tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=root)
+
+
+def main(
+    pdf_path=None,
+    save_outputs=True,
+    run_dir=None,
+    text_engine=None,
+    page_jobs=None,
+    document=None,
+):
     """Main function to analyze bill text.
 
     Args:
-        pdf_path: Optional path to PDF file. If provided, uses this instead of config path.
+        pdf_path: Optional path to PDF file (or its bytes). If provided, uses this instead of config path.
                   This enables local mode execution (e.g., iOS a-Shell).
+        save_outputs: Write the intermediate CSVs and the summary CSV. The
+                  returned summary does not depend on these files.
+        run_dir: Directory for this run's outputs. Defaults to a new
+                  make_run_dir() folder next to summarized_bill_path.
+        text_engine: Page text engine, overriding text_engine in configs.yml.
+        page_jobs: Page extraction processes, overriding page_jobs in configs.yml.
+        document: BillDocument already opened for pdf_path, shared with the
+                  caller's later stages; its summary_page is set.
+
+    Returns:
+        BillSummary: Processed bill, or None if the configuration could not be read
     """
     yaml_file = "configs.yml"
     yaml_data = read_yaml_file(yaml_file)
     if not yaml_data:
         return
 
+    summary_name = os.path.basename(yaml_data["summarized_bill_path"])
+    if save_outputs and run_dir is None:
+        run_dir = make_run_dir(os.path.dirname(yaml_data["summarized_bill_path"]))
+
     # Use provided PDF path (local mode) or config path (cloud mode)
     bill_path = pdf_path if pdf_path else yaml_data["bill_path"]
-    logging.info(f"Processing bill from: {bill_path}")
+    logging.info(
+        f"Processing bill from: "
+        f"{bill_path if isinstance(bill_path, str) else '<bytes>'}"
+    )
+
+    # open the pdf once and share it across all stages
+    if document is None:
+        document = BillDocument(
+            bill_path,
+            text_engine or yaml_data.get("text_engine", "pypdf"),
+            page_jobs or yaml_data.get("page_jobs", 1),
+        )
 
     # read the table from the pdf
-    raw_df = get_summary_table_from_pdf(
-        bill_path, yaml_data["page_number"], yaml_data["family_count"]
-    )
-    if raw_df is not None:
-        save_dataframe(raw_df, file_path="attachments/01_raw_df.csv")
+    with profile_stage("summary page discovery"):
+        page_number = locate_summary_page(
+            document, yaml_data["page_number"], yaml_data.get("layout_memory_path")
+        )
+    document.summary_page = page_number
+    with profile_stage("table row parsing"):
+        lines = parse_summary_table(document, page_number, yaml_data["family_count"])
+    # typed rows are kept for the history; pandas is only used for the export
+    raw_df = None if lines is None else bill_lines_to_dataframe(lines)
+    if raw_df is not None and save_outputs:
+        save_dataframe(
+            to_dollars(raw_df, CHARGE_COLUMNS),
+            file_path=os.path.join(run_dir, "01_raw_df.csv"),
+        )
 
     # process the table
-    df = process_text_to_dataframe(raw_df, yaml_data["plan_cost_for_all_members"])
-    if df is not None:
-        save_dataframe(df, file_path="attachments/02_processed_df.csv")
+    with profile_stage("allocation"):
+        df = process_text_to_dataframe(
+            raw_df, yaml_data["plan_cost_for_all_members"]
+        )
+    if df is not None and save_outputs:
+        save_dataframe(
+            to_dollars(df), file_path=os.path.join(run_dir, "02_processed_df.csv")
+        )
 
     # check if the processing was fine
-    total_bill_raw = get_total_from_bill(bill_path)
-    with open("attachments/03_total_bill_raw.txt", "w") as f:
-        f.write(str(total_bill_raw))
+    with profile_stage("verification"):
+        total_bill_raw = get_total_from_bill(document)
+        verify_bill_total(df, total_bill_raw)
+    bill_month = get_bill_month(document, 0)
+    if save_outputs:
+        with profile_stage("output"):
+            with open(os.path.join(run_dir, "03_total_bill_raw.txt"), "w") as f:
+                f.write(str(cents_to_dollars(total_bill_raw)))
+            if bill_month:
+                with open(os.path.join(run_dir, "billing_month.txt"), "w") as f:
+                    f.write(bill_month)
+        save_dataframe(to_dollars(df), file_path=os.path.join(run_dir, summary_name))
+        logging.info(f"Outputs saved to {run_dir}")
+    logging.info("Processing completed successfully")
 
-    total_bill_processed = float(df.total.sum())
-    assert abs(total_bill_processed - total_bill_raw) < 10**-6, (
-        f"Total bill does not match: {total_bill_processed} != {total_bill_raw}"
+    members = [MemberCharge(**record) for record in df.to_dict("records")]
+    return BillSummary(
+        bill_path,
+        bill_month,
+        total_bill_raw,
+        members,
+        get_bill_issue_date(document),
+        lines or [],
     )
 
-    save_dataframe(df, file_path=yaml_data["summarized_bill_path"])
-    logging.info("Processing completed successfully")
-
 
 if __name__ == "__main__":
     main()
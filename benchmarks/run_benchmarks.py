@@ -0,0 +1,338 @@
+"""Benchmark the bill pipeline on synthetic bills and save results as JSON.
+
+For each member count a synthetic PDF and raw text fixture are generated in a
+scratch directory, then each engine is timed end to end with per-stage
+timings from bill_profile:
+
+    engine  bill_engine.analyze_bill on the PDF (the default CLI path)
+    fast    the same with the raw content-stream text engine (--engine fast)
+    pandas  analyze_bill_text.main on the PDF (the --export path, no files)
+    text    parsing and allocation only, on the raw text fixture
+
+The scratch directory gets its own configs.yml, so runs never touch the
+repo's config, layout memory or attachments. Results are written to
+benchmarks/results/<commit>.json by default; pass --compare with an earlier
+results file to print throughput ratios between commits.
+
+--cross-check instead compares the fast text engine with pypdf's
+extract_text() page by page on the same corpus (plus any --pdfs given) and
+exits non-zero if any page differs beyond whitespace.
+
+Usage:
+    python benchmarks/run_benchmarks.py --members 10 100 1000 --repeat 3
+    python benchmarks/run_benchmarks.py --cross-check --pdfs bills/*.pdf
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import bill_profile  # noqa: E402
+from pypdf import PdfReader  # noqa: E402
+
+from bill_engine import (  # noqa: E402
+    allocate_charges,
+    analyze_bill,
+    locate_summary_page,
+    parse_summary_table,
+)
+from bill_fast_text import FastTextExtractor  # noqa: E402
+from synthetic_bill import (  # noqa: E402
+    FixtureDocument,
+    build_pdf,
+    generate_bill_pages,
+    load_text_fixture,
+    write_text_fixture,
+)
+
+ENGINES = ["engine", "fast", "pandas", "text"]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _yaml_data(members):
+    return {
+        "family_count": members,
+        "plan_cost_for_all_members": True,
+        "page_number": 1,
+        "summarized_bill_path": "summary.csv",
+        "layout_memory_path": ".bill_layouts.json",
+    }
+
+
+def _run_text(fixture_path, yaml_data):
+    document = FixtureDocument(load_text_fixture(fixture_path))
+    page_number = locate_summary_page(
+        document, yaml_data["page_number"], yaml_data["layout_memory_path"]
+    )
+    with bill_profile.profile_stage("table row parsing"):
+        lines = parse_summary_table(
+            document, page_number, yaml_data["family_count"]
+        )
+    with bill_profile.profile_stage("allocation"):
+        allocate_charges(lines, yaml_data["plan_cost_for_all_members"])
+
+
+def run_once(engine, pdf_path, fixture_path, yaml_data):
+    """Run one engine once and return (seconds, stage records)."""
+    profiler = bill_profile.enable_profiling()
+    started = time.perf_counter()
+    if engine == "engine":
+        analyze_bill(pdf_path, yaml_data)
+    elif engine == "fast":
+        analyze_bill(pdf_path, dict(yaml_data, text_engine="fast"))
+    elif engine == "pandas":
+        from analyze_bill_text import main as analyze_bill_text
+
+        analyze_bill_text(pdf_path=pdf_path, save_outputs=False)
+    else:
+        _run_text(fixture_path, yaml_data)
+    elapsed = time.perf_counter() - started
+    bill_profile.disable_profiling()
+    return elapsed, list(profiler.records.values())
+
+
+def measure_import_time(repeat=3) -> float:
+    """Best wall time of importing main.py in a fresh interpreter."""
+    code = (
+        "import time; t = time.perf_counter(); import main; "
+        "print(time.perf_counter() - t)"
+    )
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        times.append(float(out.strip().splitlines()[-1]))
+    return min(times)
+
+
+def run_benchmarks(args) -> dict:
+    if "pandas" in args.engines:
+        # Import up front so pandas' import time is not charged to the first run
+        import analyze_bill_text  # noqa: F401
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for members in args.members:
+                pages, _ = generate_bill_pages(
+                    members,
+                    args.detail_pages,
+                    args.usage_pages,
+                    args.rows_per_page,
+                )
+                pdf_path = os.path.join(workdir, f"bill_{members}.pdf")
+                fixture_path = os.path.join(workdir, f"bill_{members}.txt")
+                with open(pdf_path, "wb") as f:
+                    f.write(build_pdf(pages))
+                write_text_fixture(pages, fixture_path)
+
+                yaml_data = _yaml_data(members)
+                with open("configs.yml", "w") as f:
+                    json.dump(yaml_data, f)  # JSON is valid YAML
+
+                for engine in args.engines:
+                    runs = [
+                        run_once(engine, pdf_path, fixture_path, yaml_data)
+                        for _ in range(args.repeat)
+                    ]
+                    seconds = [elapsed for elapsed, _ in runs]
+                    best = min(range(len(runs)), key=lambda i: seconds[i])
+                    result = {
+                        "engine": engine,
+                        "members": members,
+                        "pages": len(pages),
+                        "pdf_bytes": os.path.getsize(pdf_path),
+                        "seconds_min": min(seconds),
+                        "seconds_median": statistics.median(seconds),
+                        "lines_per_second": members / min(seconds),
+                        "stages": runs[best][1],
+                    }
+                    results.append(result)
+                    print(
+                        f"{engine:<7} {members:>6} lines {len(pages):>4} pages "
+                        f"{min(seconds) * 1000:>10.1f} ms "
+                        f"{result['lines_per_second']:>12.0f} lines/s"
+                    )
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.import_budget is not None:
+        report["import_seconds"] = measure_import_time()
+        print(f"import main: {report['import_seconds'] * 1000:.1f} ms")
+    return report
+
+
+def _normalized_lines(text):
+    return [" ".join(line.split()) for line in text.split("\n") if line.strip()]
+
+
+def cross_check_pdf(pdf_path) -> dict:
+    """Compare the fast text engine with extract_text() on every page of a PDF.
+
+    Returns:
+        dict: Page count, pages identical exactly and after whitespace
+        normalization, the first differing lines, and each engine's time
+    """
+    reader = PdfReader(pdf_path)
+    fast = FastTextExtractor()
+    result = {"pages": len(reader.pages), "exact": 0, "normalized": 0}
+    result.update(pypdf_seconds=0.0, fast_seconds=0.0, differences=[])
+    for page_number, page in enumerate(reader.pages):
+        started = time.perf_counter()
+        expected = page.extract_text()
+        result["pypdf_seconds"] += time.perf_counter() - started
+        started = time.perf_counter()
+        actual = fast.page_text(page)
+        result["fast_seconds"] += time.perf_counter() - started
+
+        if actual == expected:
+            result["exact"] += 1
+        expected, actual = _normalized_lines(expected), _normalized_lines(actual)
+        if actual == expected:
+            result["normalized"] += 1
+            continue
+        for line_number, (want, got) in enumerate(zip(expected + [""], actual + [""])):
+            if want != got:
+                result["differences"].append((page_number, line_number, want, got))
+                break
+    return result
+
+
+def run_cross_check(args) -> int:
+    """Run cross_check_pdf() on the synthetic corpus and --pdfs; 1 on mismatch."""
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_paths = []
+        for members in args.members:
+            pages, _ = generate_bill_pages(
+                members, args.detail_pages, args.usage_pages, args.rows_per_page
+            )
+            pdf_paths.append(os.path.join(workdir, f"bill_{members}.pdf"))
+            with open(pdf_paths[-1], "wb") as f:
+                f.write(build_pdf(pages))
+        for pdf_path in pdf_paths + list(args.pdfs):
+            result = cross_check_pdf(pdf_path)
+            speedup = result["pypdf_seconds"] / max(result["fast_seconds"], 1e-9)
+            print(
+                f"{os.path.basename(pdf_path)}: {result['normalized']}/"
+                f"{result['pages']} pages match ({result['exact']} exactly), "
+                f"extract_text {result['pypdf_seconds'] * 1000:.1f} ms, "
+                f"fast {result['fast_seconds'] * 1000:.1f} ms ({speedup:.1f}x)"
+            )
+            for page_number, line_number, want, got in result["differences"]:
+                failed = True
+                print(f"  page {page_number} line {line_number}:")
+                print(f"    extract_text: {want!r}")
+                print(f"    fast:         {got!r}")
+    return 1 if failed else 0
+
+
+def compare(report, baseline_path) -> None:
+    """Print lines/s ratios of this run against an earlier results file."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    before = {
+        (r["engine"], r["members"]): r["lines_per_second"]
+        for r in baseline["results"]
+    }
+    print(f"\nThroughput vs {baseline['commit']} (higher is better)")
+    for r in report["results"]:
+        key = (r["engine"], r["members"])
+        if key in before:
+            ratio = r["lines_per_second"] / before[key]
+            print(f"{r['engine']:<7} {r['members']:>6} lines {ratio:>8.2f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--detail-pages", type=int, default=1)
+    parser.add_argument("--usage-pages", type=int, default=0)
+    parser.add_argument("--rows-per-page", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--output", help="Results JSON (default: benchmarks/results/<commit>.json)"
+    )
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument(
+        "--cross-check",
+        action="store_true",
+        help="Compare the fast text engine with extract_text() instead of timing",
+    )
+    parser.add_argument(
+        "--pdfs", nargs="*", default=[], help="Real bills to add to --cross-check"
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        help="Fail if importing main.py takes longer than this many seconds",
+    )
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    if args.cross_check:
+        return run_cross_check(args)
+    report = run_benchmarks(args)
+
+    output = args.output or os.path.join(
+        REPO_ROOT, "benchmarks", "results", f"{report['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    budget = args.import_budget
+    if budget is not None and report["import_seconds"] > budget:
+        print(
+            f"Import of main.py took {report['import_seconds']:.3f}s, "
+            f"over the {budget:.3f}s budget"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
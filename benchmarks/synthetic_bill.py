@@ -0,0 +1,305 @@
+"""Synthetic T-Mobile-layout bills for benchmarking.
+
+Generates PDFs (written by hand with the standard Helvetica font, so no PDF
+library is needed) and the matching raw page text fixtures, with a
+configurable number of lines, detailed-charge pages and usage pages. Amounts
+are drawn from a seeded RNG and always add up, so the full pipeline including
+the total check runs on every generated bill.
+
+Usage:
+    python benchmarks/synthetic_bill.py --members 100 --output /tmp/bill.pdf
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bill_engine import BillDocument, format_cents  # noqa: E402
+
+LINE_HEIGHT = 12
+PAGE_WIDTH = 612
+MIN_PAGE_HEIGHT = 792
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+
+
+def _cell(cents, dash_for_zero=True):
+    """Render an amount the way the summary table does ("-" for no charge)."""
+    if cents == 0 and dash_for_zero:
+        return "-"
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{format_cents(abs(cents))}"
+
+
+def _phone(index):
+    return f"(999) {100 + index // 10000:03d}-{index % 10000:04d}"
+
+
+def generate_bill_pages(
+    members=10,
+    detail_pages=1,
+    usage_pages=0,
+    rows_per_page=None,
+    month_index=0,
+    seed=0,
+):
+    """Build the text of every page of a synthetic bill.
+
+    Args:
+        members: Number of voice lines on the account
+        detail_pages: Minimum number of pages the DETAILED CHARGES section spans
+        usage_pages: Extra pages of usage details at the end
+        rows_per_page: Summary table rows per page; None keeps the whole table
+            on one (tall) page
+        month_index: Billing month, 0 for January
+        seed: RNG seed, so the same arguments always give the same bill
+
+    Returns:
+        tuple: (pages, total_cents) where pages is a list of lists of lines
+    """
+    rng = random.Random(seed)
+    month = MONTHS[month_index % 12]
+
+    lines = []
+    for i in range(members):
+        included = i < members - max(1, members // 10)
+        plans = 0 if included else rng.choice([3500, 4000, 5000])
+        equipment = rng.choice([-2125, -1834, 3333]) if rng.random() < 0.2 else 0
+        services = rng.choice([499, 1000]) if rng.random() < 0.1 else 0
+        one_time = rng.randint(1, 4000) if rng.random() < 0.3 else 0
+        lines.append((_phone(i), included, plans, equipment, services, one_time))
+
+    included_count = sum(1 for line in lines if line[1])
+    account = (max(included_count, 1) * 2800, 0, rng.choice([0, 300]), 0)
+    total = sum(account) + sum(sum(line[2:]) for line in lines)
+    column_totals = [
+        account[c] + sum(line[2 + c] for line in lines) for c in range(4)
+    ]
+
+    def header(page_number):
+        return [
+            "Bill issue date",
+            f"{month[:3]} 25, 2025",
+            "Page",
+            f"{page_number}\xa0of\xa0",
+            "Account",
+            "0992 8",
+        ]
+
+    first_page = header(1) + [
+        "TOTAL DUE",
+        format_cents(total),
+        f"Your bill is due by {month[:3]} 18, 2025.",
+        "Hello,",
+        f"Here's your bill for {month}.",
+        "PLANS",
+        format_cents(column_totals[0]),
+        f"{members} VOICE LINES = {format_cents(column_totals[0])}",
+        "EQUIPMENT",
+        _cell(column_totals[1], dash_for_zero=False),
+        "SERVICES",
+        _cell(column_totals[2], dash_for_zero=False),
+        "ONE-TIME CHARGES",
+        _cell(column_totals[3], dash_for_zero=False),
+    ]
+
+    account_cells = " ".join(_cell(v) for v in account)
+    table_rows = [f"Account {account_cells} {format_cents(sum(account))}"]
+    for phone, included, plans, equipment, services, one_time in lines:
+        cells = ["Included" if included else _cell(plans)]
+        cells += [_cell(equipment), _cell(services), _cell(one_time)]
+        line_total = plans + equipment + services + one_time
+        line_cells = " ".join(cells + [_cell(line_total, False)])
+        table_rows.append(f"{phone} Voice {line_cells}")
+
+    totals_cells = " ".join(_cell(v, False) for v in column_totals)
+    table_header = [
+        "THIS BILL SUMMARY",
+        "Line Type Plans Equipment Services One-time charges T otal",
+        f"T otals {totals_cells} {format_cents(total)}",
+    ]
+
+    pages = [first_page]
+    per_page = rows_per_page or len(table_rows)
+    for start in range(0, len(table_rows), per_page):
+        page = header(len(pages) + 1)
+        if start == 0:
+            page += table_header
+        else:
+            page += ["THIS BILL SUMMARY (continued)", table_header[1]]
+        page += table_rows[start : start + per_page]
+        pages.append(page)
+
+    detail = ["DETAILED CHARGES"]
+    sections = [
+        ("PLANS", 2, "Magenta MAX"),
+        ("EQUIPMENT", 3, "Device installment 16 of 24"),
+        ("SERVICES", 4, "Netflix Standard with ads"),
+        ("ONE-TIME CHARGES", 5, "International roaming usage"),
+    ]
+    for title, column, description in sections:
+        detail.append(f"{title} {_cell(column_totals[column - 2], False)}")
+        if account[column - 2]:
+            detail.append(f"Account {description} {_cell(account[column - 2], False)}")
+        for phone, included, *amounts in lines:
+            amount = amounts[column - 2]
+            if column == 2 and included:
+                detail += [phone, f"{description} Included"]
+            elif amount:
+                detail += [phone, f"{description} {_cell(amount, False)}"]
+    detail_per_page = max(len(detail) // max(detail_pages, 1) + 1, 1)
+    pages[-1] += detail[:1]
+    detail = detail[1:]
+    for start in range(0, max(len(detail), 1), detail_per_page):
+        page = header(len(pages) + 1) + detail[start : start + detail_per_page]
+        pages.append(page)
+
+    for _ in range(usage_pages):
+        usage = header(len(pages) + 1) + ["USAGE CHARGE DETAILS", "TALK"]
+        usage += [
+            f"Dec {rng.randint(1, 28)} 10:{rng.randint(10, 59)} AM "
+            f"Incoming to New York Metro R {rng.randint(1, 9)} $0.25"
+            for _ in range(60)
+        ]
+        pages.append(usage)
+
+    return pages, total
+
+
+def _pdf_string(text):
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("cp1252", errors="replace")
+
+
+def build_pdf(pages) -> bytes:
+    """Write pages of text lines as a minimal PDF using Helvetica.
+
+    Each line is drawn with its own Tj operator followed by T*, so text
+    extraction sees one line per entry. Pages grow taller than US Letter when
+    they hold more lines than fit.
+    """
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in once the page tree exists
+    page_tree = add(b"")
+    font = add(
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>"
+    )
+
+    page_ids = []
+    for lines in pages:
+        height = max(MIN_PAGE_HEIGHT, 72 + LINE_HEIGHT * len(lines))
+        stream = [f"BT /F1 10 Tf {LINE_HEIGHT} TL 50 {height - 50} Td ".encode()]
+        for line in lines:
+            stream.append(b"(" + _pdf_string(line) + b") Tj T* ")
+        stream.append(b"ET")
+        content = b"".join(stream)
+        content_id = add(
+            f"<< /Length {len(content)} >>\nstream\n".encode()
+            + content
+            + b"\nendstream"
+        )
+        page_ids.append(
+            add(
+                f"<< /Type /Page /Parent {page_tree} 0 R "
+                f"/MediaBox [0 0 {PAGE_WIDTH} {height}] "
+                f"/Resources << /Font << /F1 {font} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>".encode()
+            )
+        )
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[page_tree - 1] = (
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    )
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def write_text_fixture(pages, path) -> None:
+    """Save page texts as a raw text fixture, pages separated by form feeds."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\f".join("\n".join(lines) for lines in pages))
+
+
+def load_text_fixture(path) -> list:
+    """Load a raw text fixture as a list of page texts."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().split("\f")
+
+
+class FixtureDocument(BillDocument):
+    """BillDocument stand-in backed by page texts instead of a PDF.
+
+    Lets the parsing and allocation stages be benchmarked without the cost of
+    PDF text extraction.
+
+    Args:
+        page_texts: Text of each page
+    """
+
+    def __init__(self, page_texts):
+        self.path = None
+        self.reader = None
+        self.page_jobs = 1
+        self._source = None
+        self._page_text = dict(enumerate(page_texts))
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_text)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=10)
+    parser.add_argument("--detail-pages", type=int, default=1)
+    parser.add_argument("--usage-pages", type=int, default=0)
+    parser.add_argument("--rows-per-page", type=int, default=None)
+    parser.add_argument("--month", type=int, default=0, help="0 for January")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="PDF path to write")
+    parser.add_argument("--text", help="Also write the raw text fixture here")
+    args = parser.parse_args(argv)
+
+    pages, total = generate_bill_pages(
+        args.members,
+        args.detail_pages,
+        args.usage_pages,
+        args.rows_per_page,
+        args.month,
+        args.seed,
+    )
+    with open(args.output, "wb") as f:
+        f.write(build_pdf(pages))
+    if args.text:
+        write_text_fixture(pages, args.text)
+    print(f"Wrote {len(pages)} pages to {args.output}, total due {format_cents(total)}")
+
+
+if __name__ == "__main__":
+    main()
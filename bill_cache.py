@@ -0,0 +1,127 @@
+"""Persistent content-hash cache of processed bill summaries.
+
+Entries are keyed by the SHA-256 of the PDF bytes combined with a hash of
+configs.yml and MEMBER_NAMES, so sharing the same bill twice returns the stored
+summary rows without parsing the PDF or running pandas again.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+
+DEFAULT_CACHE_DIR = ".bill_cache"
+DEFAULT_MAX_ENTRIES = 64
+
+# Bump when the stored result format changes so old entries are ignored
+CACHE_FORMAT_VERSION = 4
+
+
+def file_sha256(path, chunk_size=1 << 16) -> str:
+    """Return the hex SHA-256 digest of a file's bytes, or of bytes given directly.
+
+    Files are hashed through a read-only memory map when possible, so no copy
+    of the PDF is made and the pages read are the same page-cache pages the
+    BillDocument mapping of the file uses.
+    """
+    if not isinstance(path, str):
+        return hashlib.sha256(path).hexdigest()
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        except (ValueError, OSError):  # empty file or not mappable
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_hash(config_path="configs.yml", member_names=None) -> str:
+    """Return a digest of everything besides the PDF that affects the summary.
+
+    Args:
+        config_path: Path to configs.yml
+        member_names: MEMBER_NAMES JSON string (default: read from environment)
+
+    Returns:
+        str: Hex SHA-256 digest of the config file bytes and name mapping
+    """
+    if member_names is None:
+        member_names = os.environ.get("MEMBER_NAMES", "")
+    digest = hashlib.sha256()
+    try:
+        with open(config_path, "rb") as f:
+            digest.update(f.read())
+    except FileNotFoundError:
+        pass
+    digest.update(b"\0")
+    digest.update(member_names.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BillCache:
+    """Directory of JSON bill results with least-recently-used eviction.
+
+    Each entry is one file named after its key. Reads refresh the file's
+    modification time, so the oldest mtimes are the least recently used
+    entries and are removed first once ``max_entries`` is exceeded.
+
+    Args:
+        cache_dir: Directory holding the cache entries
+        max_entries: Maximum number of entries to keep
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def make_key(self, pdf_path, config_path="configs.yml") -> str:
+        """Build the cache key for a bill (path or bytes) under the current config."""
+        combined = ":".join(
+            [str(CACHE_FORMAT_VERSION), file_sha256(pdf_path), config_hash(config_path)]
+        )
+        return hashlib.sha256(combined.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, "r") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)
+        logging.info(f"Cache hit for {key[:12]}")
+        return result
+
+    def put(self, key, result) -> None:
+        """Store a result and evict the least recently used entries."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+        logging.info(f"Cached result for {key[:12]}")
+        self._evict()
+
+    def _evict(self):
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".json")
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[: len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+                logging.info(f"Evicted cache entry {os.path.basename(path)}")
+            except FileNotFoundError:
+                pass
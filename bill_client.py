@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Thin client for the resident bill daemon (``python main.py --serve``).
+
+Sends the bill to the daemon and prints the summary it returns, importing
+nothing beyond the standard library. If no daemon is running the bill is
+processed locally by main.py instead, so shortcuts can always call this.
+
+Usage:
+    python bill_client.py /path/to/bill.pdf
+    python bill_client.py - < /path/to/bill.pdf
+    python bill_client.py --socket /path/to/.bill_server.sock /path/to/bill.pdf
+"""
+
+import io
+import sys
+
+from bill_server import DEFAULT_SOCKET_PATH, request_summary
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET_PATH
+    if len(args) >= 2 and args[0] == "--socket":
+        socket_path, args = args[1], args[2:]
+    no_cache = "--no-cache" in args
+    paths = [arg for arg in args if arg != "--no-cache"]
+
+    if not paths:
+        print("Error: Please provide a PDF file path")
+        print("Usage: python bill_client.py /path/to/bill.pdf")
+        sys.exit(1)
+
+    pdf_bytes = sys.stdin.buffer.read() if paths[0] == "-" else None
+    try:
+        if pdf_bytes is not None:
+            reply = request_summary(socket_path, pdf_bytes=pdf_bytes, no_cache=no_cache)
+        else:
+            reply = request_summary(socket_path, pdf_path=paths[0], no_cache=no_cache)
+    except OSError:
+        # No daemon listening: fall back to processing the bill in this process
+        import main as bill_main
+
+        if pdf_bytes is not None:
+            sys.stdin = io.TextIOWrapper(io.BytesIO(pdf_bytes))  # already consumed
+        sys.argv = [sys.argv[0]] + args
+        bill_main.main()
+        return
+
+    if not reply["ok"]:
+        print(reply["error"])
+        sys.exit(1)
+    print(reply["output"])
+
+
+if __name__ == "__main__":
+    main()
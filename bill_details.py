@@ -0,0 +1,238 @@
+"""Streaming parser for the DETAILED CHARGES section of a bill.
+
+The summary table only has one total per line and charge column. The pages
+after it itemize those totals (plan prices, device installments, add-on
+services, one-time fees). This module reads that section page by page
+without caching the page text, yields one LineItem per charge as it is read,
+and sums the items per phone line as they arrive. Memory use stays flat no
+matter how many lines or usage pages the statement has.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+
+from bill_engine import (
+    DETAIL_MARKER,
+    format_cents,
+    get_cents_from_str,
+    strip_page_header,
+)
+
+# Sections that follow the itemized charges and are not part of them
+DETAIL_END_MARKERS = (
+    "USAGE CHARGE DETAILS",
+    "TAXES & FEES BREAKDOWN",
+    "WHAT YOU NEED TO KNOW",
+)
+# Side panels printed next to the charges; their amounts are not charges
+SIDEBAR_MARKERS = ("YOU SAVED", "YOU USED")
+
+# Section header in the bill -> BillLine/MemberCharge field name
+DETAIL_SECTIONS = {
+    "PLANS": "plans",
+    "EQUIPMENT": "equipment",
+    "SERVICES": "services",
+    "ONE-TIME CHARGES": "one_time_charges",
+}
+SECTION_LABELS = {
+    "plans": "Plans",
+    "equipment": "Equipment",
+    "services": "Services",
+    "one_time_charges": "One-time charges",
+}
+
+_AMOUNT = r"-?\$[\d,]+\.\d{2}"
+_SECTION_PATTERN = re.compile(
+    rf"^({'|'.join(re.escape(title) for title in DETAIL_SECTIONS)})\b.*?({_AMOUNT})$"
+)
+_PHONE_PATTERN = re.compile(r"^(\(\d{3}\) \d{3}-\d{4})\s*(.*)$")
+_ITEM_PATTERN = re.compile(rf"^(.*?)\s*({_AMOUNT}|Included)$")
+_DATE_RANGE_PATTERN = re.compile(r"\s*[A-Z][a-z]{2} \d{1,2} - [A-Z][a-z]{2} \d{1,2}$")
+
+
+@dataclass
+class LineItem:
+    """One itemized charge from the DETAILED CHARGES section.
+
+    ``cell_num`` is the phone number, "Account" for account-level charges, or
+    None when the bill does not name the line. ``section`` is one of the
+    DETAIL_SECTIONS field names and ``amount`` is in integer cents.
+    """
+
+    cell_num: str
+    section: str
+    description: str
+    amount: int
+    included: bool = False
+
+
+@dataclass
+class DetailedCharges:
+    """Itemized charges summed per line and section, in integer cents.
+
+    Attributes:
+        lines: cell_num -> {section: cents}, in order of first appearance
+        section_totals: Amount printed on each section header
+        item_count: Number of line items read
+    """
+
+    lines: dict = field(default_factory=dict)
+    section_totals: dict = field(default_factory=dict)
+    item_count: int = 0
+
+    def add(self, item: LineItem) -> None:
+        """Add one line item to the running totals."""
+        line = self.lines.setdefault(
+            item.cell_num, dict.fromkeys(DETAIL_SECTIONS.values(), 0)
+        )
+        line[item.section] += item.amount
+        self.item_count += 1
+
+
+def iter_detail_lines(document, start_page=0):
+    """Yield the text lines of the DETAILED CHARGES section, page by page.
+
+    Pages are extracted one at a time (or page_jobs at a time in parallel)
+    and not cached on the document, so only the current pages' text is held
+    in memory.
+
+    Args:
+        document: BillDocument for the bill
+        start_page: First page to scan for the section marker, usually the
+            summary page
+
+    Yields:
+        str: Stripped lines between DETAILED CHARGES and the end of the section
+    """
+    in_details = False
+    pages = range(start_page, document.page_count)
+    for _, lines in document.iter_page_lines(pages, cache=False):
+        for line in strip_page_header(lines):
+            line = line.replace("\xa0", " ").strip()
+            if not in_details:
+                in_details = line == DETAIL_MARKER
+            elif line in DETAIL_END_MARKERS:
+                return
+            elif line:
+                yield line
+
+
+def _is_subheading(description: str) -> bool:
+    """Whether an amount line is a subsection title such as REGULAR CHARGES."""
+    title = _DATE_RANGE_PATTERN.sub("", description)
+    return any(c.isalpha() for c in title) and title == title.upper()
+
+
+def iter_line_items(lines, section_totals=None):
+    """Turn DETAILED CHARGES lines into LineItem objects as they are read.
+
+    A phone number (or "Account") at the start of a line names the line the
+    next charge belongs to; charges without one get cell_num None. A charge
+    is a line ending in an amount or "Included"; when the amount sits on its
+    own line, the first text line since the previous charge is used as its
+    description. All-caps subsection titles (REGULAR CHARGES, HANDSETS) are
+    skipped.
+
+    Args:
+        lines: Lines from iter_detail_lines()
+        section_totals: Optional dict filled with the amount printed on each
+            section header, keyed by section field name
+
+    Yields:
+        LineItem: Each itemized charge, in bill order
+    """
+    section = None
+    cell_num = None
+    pending = None
+    for line in lines:
+        match = _SECTION_PATTERN.match(line)
+        if match:
+            section = DETAIL_SECTIONS[match.group(1)]
+            cell_num, pending = None, None
+            if section_totals is not None:
+                section_totals[section] = section_totals.get(
+                    section, 0
+                ) + get_cents_from_str(match.group(2))
+            continue
+        if line in SIDEBAR_MARKERS:
+            section = None
+            continue
+        if section is None:
+            continue
+
+        match = _PHONE_PATTERN.match(line)
+        if match:
+            cell_num, pending, line = match.group(1), None, match.group(2)
+        elif line == "Account" or line.startswith("Account "):
+            cell_num, pending, line = "Account", None, line[len("Account") :].strip()
+        if not line:
+            continue
+
+        match = _ITEM_PATTERN.match(line)
+        if match is None:
+            if _is_subheading(line):
+                pending = None
+            elif pending is None:
+                pending = line
+            continue
+        description = match.group(1) or pending or ""
+        pending = None
+        if _is_subheading(description):
+            continue
+        included = match.group(2) == "Included"
+        amount = 0 if included else get_cents_from_str(match.group(2))
+        yield LineItem(cell_num, section, description, amount, included)
+        cell_num = None
+
+
+def summarize_detailed_charges(document, start_page=0) -> DetailedCharges:
+    """Parse and total the DETAILED CHARGES section of a bill.
+
+    Args:
+        document: BillDocument for the bill
+        start_page: First page to scan for the section, usually the summary page
+
+    Returns:
+        DetailedCharges: Itemized charges summed per line and section
+    """
+    details = DetailedCharges()
+    for item in iter_line_items(
+        iter_detail_lines(document, start_page), details.section_totals
+    ):
+        details.add(item)
+
+    for section, expected in details.section_totals.items():
+        itemized = sum(line[section] for line in details.lines.values())
+        if itemized != expected:
+            logging.warning(
+                f"Itemized {section} add up to {format_cents(itemized)}, "
+                f"section header says {format_cents(expected)}"
+            )
+    logging.info(f"Parsed {details.item_count} detailed charges")
+    return details
+
+
+def format_detailed_charges(details: DetailedCharges, member_names=None) -> str:
+    """Render the per-line itemized totals as dot-leader text.
+
+    Args:
+        details: Result of summarize_detailed_charges()
+        member_names: Optional phone-number-to-name mapping
+
+    Returns:
+        str: One block per line with charges, listing its non-zero sections
+    """
+    member_names = member_names or {}
+    out = ["\nDetailed Charges"]
+    for cell_num, sections in details.lines.items():
+        charged = [(s, amount) for s, amount in sections.items() if amount]
+        if not charged:
+            continue
+        out.append(f"\n{member_names.get(cell_num, cell_num) or 'Unattributed'}")
+        for section, amount in charged:
+            label = SECTION_LABELS[section]
+            total = format_cents(amount)
+            dots = "." * max(36 - len(label) - len(total), 2)
+            out.append(f"  {label} {dots} {total}")
+    return "\n".join(out)
@@ -0,0 +1,1114 @@
+"""Lightweight bill engine that runs without pandas or numpy.
+
+Holds the PDF reading and row parsing helpers shared with analyze_bill_text,
+plus plain-dataclass versions of process_text_to_dataframe's cost allocation
+and the bill summary rendering. The single-bill CLI imports only this
+module, which keeps startup fast on a-Shell where importing pandas dominates
+the run time; pandas is loaded only when CSV exports are requested.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import re
+import sys
+import weakref
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from datetime import datetime
+
+import yaml
+from pypdf import PdfReader  # Pure Python PDF library (iOS a-Shell compatible)
+
+from bill_profile import profile_stage
+
+
+def read_yaml_file(file_path):
+    """Reads and parses a YAML file."""
+    logging.info(f"Reading YAML file from {file_path}")
+    try:
+        with open(file_path, "r") as file:
+            data = yaml.safe_load(file)
+            logging.info("YAML file read successfully")
+            return data
+    except (yaml.YAMLError, FileNotFoundError) as e:
+        logging.error(f"Error reading YAML file: {e}")
+        return None
+
+
+def find_nth_occurrence(strings: list, target: str, n: int = 1) -> int:
+    """Return index of nth occurrence of target string in strings list.
+
+    Args:
+        strings: List of strings to search
+        target: String to find
+        n: Occurrence number (1-based)
+
+    Returns:
+        Index of nth occurrence or -1 if not found
+
+    Example:
+        >>> find_nth_occurrence(["a", "b", "a", "c", "a"], "a", 3)
+        4
+    """
+    count = 0
+    for i, s in enumerate(strings):
+        if s == target:
+            count += 1
+            if count == n:
+                return i
+    return -1
+
+
+_CURRENCY_PATTERN = re.compile(r"([-+]?)\$?(\d{1,4}(?:,\d{3})*)(?:\.(\d+))?")
+
+# One summary table cell: a dollar amount, "Included" or "-" for no charge
+_CELL = r"[-+]?\$?\d{1,4}(?:,\d{3})*(?:\.\d+)?|Included|-"
+_CELL_PATTERN = re.compile(_CELL)
+CHARGE_COLUMNS = ["plans", "equipment", "services", "one_time_charges", "total"]
+
+# A whole summary table row: "Account" or "(999) 637-3009 Voice", then five cells
+_SUMMARY_ROW_PATTERN = re.compile(
+    r"(?:(?P<account>Account)"
+    r"|\((?P<area>\d+)\)\s*(?P<exchange>\d+)-(?P<number>\d+)\s+(?P<line_type>Voice))"
+    + "".join(rf"\s+(?P<{column}>{_CELL})" for column in CHARGE_COLUMNS)
+    + r"(?=\s|$)"
+)
+
+# Tolerant version for unknown layouts: any line type words ("Mobile Internet")
+_GENERAL_ROW_PATTERN = re.compile(
+    r"(?:(?P<account>Account)"
+    r"|\((?P<area>\d+)\)\s*(?P<exchange>\d+)-(?P<number>\d+)"
+    r"\s+(?P<line_type>[A-Za-z][A-Za-z ]*?))"
+    + "".join(rf"\s+(?P<{column}>{_CELL})" for column in CHARGE_COLUMNS)
+    + r"(?=\s|$)"
+)
+_TOTALS_PATTERN = re.compile(r"T\s?otals?\b", re.IGNORECASE)
+
+# Summary page landmarks: title above the table, section below it, column
+# header and the labels repeated at the top of every page
+SUMMARY_MARKER = "THIS BILL SUMMARY"
+DETAIL_MARKER = "DETAILED CHARGES"
+TABLE_HEADER_PREFIX = "Line Type "
+_PAGE_HEADER_LABELS = ("Bill issue date", "Page", "Account")
+DEFAULT_LAYOUT_MEMORY_PATH = ".bill_layouts.json"
+
+
+def get_cents_from_str(s: str) -> int:
+    r"""Convert currency strings to integer cents while handling edge cases.
+
+    Amounts are kept as integer cents everywhere in the engine so member
+    shares add up to the billed total exactly, without float tolerances.
+
+    Examples:
+        get_cents_from_str("-$280.83") → -28083
+        get_cents_from_str("$1,234.56") → 123456
+        get_cents_from_str("-") → 0
+        get_cents_from_str("Included") → "Included"
+    """
+    if s == "-":
+        return 0
+
+    match = _CURRENCY_PATTERN.search(str(s))
+    if not match:
+        return s
+
+    sign, whole, fraction = match.groups()
+    return _amount_to_cents(sign == "-", whole, fraction or "")
+
+
+def _amount_to_cents(negative: bool, whole: str, fraction: str) -> int:
+    cents = int(whole.replace(",", "")) * 100 + int(fraction[:2].ljust(2, "0"))
+    if len(fraction) > 2 and fraction[2] >= "5":  # round half away from zero
+        cents += 1
+    return -cents if negative else cents
+
+
+def _cell_to_cents(cell: str):
+    """Convert a cell already matched by the row pattern to cents or "Included"."""
+    if cell == "-":
+        return 0
+    if cell == "Included":
+        return cell
+    whole, _, fraction = cell.lstrip("+-$").replace("$", "").partition(".")
+    return _amount_to_cents(cell[0] == "-", whole, fraction)
+
+
+def split_cents(amount: int, parts: int) -> list:
+    """Split an amount of cents into ``parts`` shares that sum to it exactly.
+
+    Every share gets the floor of the even split and the leftover cents go one
+    each to the first shares, so earlier lines on the bill absorb the remainder
+    deterministically.
+
+    Example:
+        >>> split_cents(1000, 3)
+        [334, 333, 333]
+        >>> split_cents(-1000, 3)
+        [-333, -333, -334]
+    """
+    base, remainder = divmod(amount, parts)
+    return [base + 1] * remainder + [base] * (parts - remainder)
+
+
+def format_cents(cents: int) -> str:
+    """Format integer cents as a dollar string, e.g. 123456 → "$1,234.56"."""
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), 100)
+    return f"${sign}{dollars:,}.{cents:02d}"
+
+
+def cents_to_dollars(cents: int) -> float:
+    """Convert integer cents to dollars for CSV exports."""
+    return cents / 100
+
+
+# Page text extractors: pypdf's extract_text() or the content-stream scanner
+TEXT_ENGINES = ("pypdf", "fast")
+
+
+def map_pdf(path):
+    """Memory-map a PDF file read-only for use as the PdfReader stream.
+
+    pypdf reads a file given by path into a bytes copy first; a mapping lets
+    it read straight from the operating system's page cache instead, which
+    the cache key hash of the same file (bill_cache.file_sha256) also reads
+    from. Files that cannot be mapped (empty files, pipes) are read into
+    bytes instead.
+
+    Args:
+        path: Path to the PDF file
+
+    Returns:
+        mmap.mmap or bytes: The file's contents
+    """
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return f.read()
+
+
+class BillDocument:
+    """A bill PDF opened once and shared by every pipeline stage.
+
+    Parsing the PDF cross-reference table and laying out page text are the
+    expensive parts of a run, so the reader is created a single time and
+    ``extract_text()`` results are memoized per page. ``summary_page`` is set
+    once the pipeline has found the summary table, so later stages (the
+    DETAILED CHARGES parser) start from it without searching again.
+
+    Args:
+        path: Path to PDF file containing phone bill (memory-mapped, see
+            map_pdf()), or the PDF's bytes
+        text_engine: "pypdf" for ``extract_text()`` or "fast" for the raw
+            content-stream scanner in bill_fast_text
+        page_jobs: Worker processes for iter_page_texts(); 1 extracts serially
+    """
+
+    def __init__(self, path, text_engine="pypdf", page_jobs=1):
+        if text_engine not in TEXT_ENGINES:
+            raise ValueError(f"Unknown text engine: {text_engine}")
+        self.path = path if isinstance(path, str) else "<bytes>"
+        self.text_engine = text_engine
+        self.page_jobs = page_jobs
+        self._source = path
+        self._shared = None
+        self.summary_page = None
+        with profile_stage("pdf open"):
+            data = map_pdf(path) if isinstance(path, str) else path
+            if isinstance(data, (bytes, bytearray)):
+                data = io.BytesIO(data)  # shares the bytes until written to
+            self.reader = PdfReader(data)
+        self._page_text = {}
+        self._fast_text = None
+        if text_engine == "fast":
+            from bill_fast_text import FastTextExtractor
+
+            self._fast_text = FastTextExtractor()
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the document."""
+        return len(self.reader.pages)
+
+    def page_text(self, page_number: int, cache: bool = True) -> str:
+        """Return the extracted text of a page, extracting it on first use.
+
+        Args:
+            page_number: Zero-based page index
+            cache: Keep the text for later calls. Streaming readers pass False
+                so a long statement is never held in memory all at once
+        """
+        text = self._page_text.get(page_number)
+        if text is None:
+            with profile_stage("page text extraction"):
+                page = self.reader.pages[page_number]
+                if self._fast_text is not None:
+                    text = self._fast_text.page_text(page)
+                else:
+                    text = page.extract_text()
+            if cache:
+                self._page_text[page_number] = text
+        return text
+
+    def page_lines(self, page_number: int, cache: bool = True) -> list:
+        """Return the non-blank lines of a page."""
+        return _non_blank_lines(self.page_text(page_number, cache))
+
+    def iter_page_texts(self, page_numbers, cache: bool = True):
+        """Yield (page_number, text) for several pages, in the order given.
+
+        With page_jobs above 1, uncached pages are extracted page_jobs at a
+        time across a process pool (see bill_parallel), so a caller that stops
+        early wastes at most one window of extraction.
+
+        Args:
+            page_numbers: Zero-based page indexes
+            cache: Keep the texts for later calls (see page_text())
+        """
+        page_numbers = list(page_numbers)
+        window = max(self.page_jobs, 1)
+        for start in range(0, len(page_numbers), window):
+            chunk = page_numbers[start : start + window]
+            texts = self._extract_in_workers(
+                [n for n in chunk if n not in self._page_text]
+            )
+            for page_number in chunk:
+                text = texts.get(page_number)
+                if text is None:
+                    text = self.page_text(page_number, cache)
+                elif cache:
+                    self._page_text[page_number] = text
+                yield page_number, text
+
+    def iter_page_lines(self, page_numbers, cache: bool = True):
+        """Like iter_page_texts(), yielding the non-blank lines of each page."""
+        for page_number, text in self.iter_page_texts(page_numbers, cache):
+            yield page_number, _non_blank_lines(text)
+
+    def _extract_in_workers(self, page_numbers) -> dict:
+        if self.page_jobs <= 1 or len(page_numbers) < 2 or self._source is None:
+            return {}
+        import bill_parallel
+
+        if self._shared is None:
+            self._shared = bill_parallel.share_source(self._source)
+            if self._shared[1] is not None:
+                # unlink the block when the document goes away; the finalizer
+                # must not reference the document itself
+                weakref.finalize(self, bill_parallel.release_block, self._shared[1])
+        source = self._shared[0]
+        with profile_stage("page text extraction"):
+            texts = bill_parallel.page_pool(self.page_jobs).map(
+                bill_parallel.extract_page,
+                [source] * len(page_numbers),
+                page_numbers,
+                [self.text_engine] * len(page_numbers),
+            )
+            return dict(zip(page_numbers, texts))
+
+
+def _non_blank_lines(text) -> list:
+    return [line for line in text.split("\n") if line.strip() != ""]
+
+
+def get_bill_month(document, page_number=0):
+    """
+    Extracts the billing month from the specified page of the PDF document.
+    Looks for the text after "Here's your bill for ".
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Page number to extract from (default: 0)
+
+    Returns:
+        str: Billing month string if found, else None
+    """
+    text = document.page_text(page_number)
+    match = re.search(r"Here's your bill for\s+([^\n]+)", text)
+    if match:
+        bill_month = match.group(1).strip()[:-1]  # Remove trailing period and spaces
+        logging.info(f"Billing month extracted: {bill_month}")
+        return bill_month
+    else:
+        logging.error("Billing month not found in the document")
+        return None
+
+
+def parse_table_row(row):
+    """Parse a single table row from pypdf extracted text.
+
+    Args:
+        row: Single line string from the bill summary table
+
+    Returns:
+        list: Parsed row with 7 elements
+            [cell_nums, line_type, plans, equipment, services, one_time, total]
+        None if parsing fails
+
+    Example:
+        >>> parse_table_row("(999) 637-3009 Voice Included - - $0.53 $0.53")
+        ['(999) 637-3009', 'Voice', 'Included', '-', '-', '$0.53', '$0.53']
+    """
+    match = _GENERAL_ROW_PATTERN.match(row)
+    if not match:
+        return None
+    cell_num, line_type = _row_identity(match)
+    return [cell_num, line_type] + [match.group(column) for column in CHARGE_COLUMNS]
+
+
+def _row_identity(match):
+    if match.group("account"):
+        return "Account", ""
+    phone = f"({match.group('area')}) {match.group('exchange')}-{match.group('number')}"
+    return phone, match.group("line_type")
+
+
+def tokenize_summary_line(line, pattern=_SUMMARY_ROW_PATTERN):
+    """Turn one summary table line into a BillLine in a single regex scan.
+
+    The precompiled row pattern captures the phone number, line type and all
+    five charge cells at once, and the cells are converted straight to cents,
+    so no per-cell regex or split() is needed.
+
+    Args:
+        line: Single line string from the bill summary table
+        pattern: Row pattern of the bill's layout (default: the Voice-line
+            T-Mobile table)
+
+    Returns:
+        BillLine: Typed row with amounts in cents, or None if the line is not
+        a table row
+
+    Raises:
+        ValueError: If "Included" appears outside the plans column
+    """
+    match = pattern.match(line)
+    if not match:
+        return None
+    cell_num, line_type = _row_identity(match)
+    values = [_cell_to_cents(match.group(column)) for column in CHARGE_COLUMNS]
+    return _make_bill_line(cell_num, line_type, values)
+
+
+def bill_line_from_cells(cell_num, line_type, cells):
+    """Build a BillLine from the five charge cells of a row read cell by cell.
+
+    Used when the cells come from separate text fragments rather than one
+    extracted line, so each cell is validated on its own.
+
+    Args:
+        cell_num: Phone number or "Account"
+        line_type: Line type words ("" for the account row)
+        cells: Cell strings in CHARGE_COLUMNS order
+
+    Returns:
+        BillLine: Typed row with amounts in cents, or None if the cells are not
+        five table cells
+
+    Raises:
+        ValueError: If "Included" appears outside the plans column
+    """
+    if len(cells) != len(CHARGE_COLUMNS) or not all(
+        _CELL_PATTERN.fullmatch(cell) for cell in cells
+    ):
+        return None
+    values = [_cell_to_cents(cell) for cell in cells]
+    return _make_bill_line(cell_num, line_type, values)
+
+
+def _make_bill_line(cell_num, line_type, values):
+    included = values[0] == "Included"
+    if included:
+        values[0] = 0
+    if "Included" in values:
+        raise ValueError(f"Unexpected 'Included' charge for {cell_num}")
+    return BillLine(cell_num, line_type, *values, included=included)
+
+
+def get_total_from_bill(document, page_number=0):
+    """Extract the total due amount from the PDF bill.
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Page number to extract from (default: 0)
+
+    Returns:
+        int: Total bill amount in cents
+    """
+    data = document.page_lines(page_number)
+    total_idx = find_nth_occurrence(data, "TOTAL DUE", 1)
+    return get_cents_from_str(data[total_idx + 1])
+
+
+def get_bill_issue_date(document, page_number=0):
+    """Extract the bill issue date from the PDF bill.
+
+    The billing month alone has no year, so the issue date is what places a
+    bill on the calendar for history and year-to-date queries.
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Page number to extract from (default: 0)
+
+    Returns:
+        str: Issue date as YYYY-MM-DD, or None if not found
+    """
+    data = [line.strip() for line in document.page_lines(page_number)]
+    date_idx = find_nth_occurrence(data, "Bill issue date", 1)
+    if date_idx == -1 or date_idx + 1 >= len(data):
+        logging.error("Bill issue date not found in the document")
+        return None
+    try:
+        return datetime.strptime(data[date_idx + 1], "%b %d, %Y").date().isoformat()
+    except ValueError:
+        logging.error(f"Could not parse bill issue date: {data[date_idx + 1]}")
+        return None
+
+
+def strip_page_header(lines):
+    """Drop the issue date, page number and account block atop a page.
+
+    Args:
+        lines: Lines of a page from BillDocument.page_lines()
+
+    Returns:
+        list: The lines after the header, or all lines if there is none
+    """
+    if not lines or lines[0].strip() != "Bill issue date":
+        return lines
+    end = 0
+    for i, line in enumerate(lines[:8]):
+        if line.strip() in _PAGE_HEADER_LABELS:
+            end = i + 2  # the label and the value below it
+    return lines[end:]
+
+
+def _is_table_chrome(line):
+    """Whether a summary table line is a title, column header or totals row."""
+    return bool(
+        line.startswith((SUMMARY_MARKER, TABLE_HEADER_PREFIX))
+        or _TOTALS_PATTERN.match(line)
+    )
+
+
+def get_summary_table_lines(document, page_number):
+    """Return the text lines of the billing summary table.
+
+    Accounts with many lines spill the table over several pages, so reading
+    continues on the following pages, without their page header, repeated
+    title and column header, up to the first "DETAILED CHARGES".
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Zero-based page index where the summary table starts
+
+    Returns:
+        list: Table lines between the column header and "DETAILED CHARGES",
+        without the totals row. None if the table boundaries could not be found
+    """
+    logging.info(f"Getting summary table from page {page_number} of PDF")
+
+    # Table starts after the "THIS BILL SUMMARY" and column header lines
+    data = [line.strip() for line in document.page_lines(page_number)]
+    try:
+        start = data.index(SUMMARY_MARKER) + 2
+    except ValueError as e:
+        logging.error(f"Could not find table boundaries: {e}")
+        return None
+
+    # Table ends at "DETAILED CHARGES", possibly on a later page
+    table_lines = []
+    pages = document.iter_page_lines(range(page_number + 1, document.page_count))
+    for page in range(page_number, document.page_count):
+        if page != page_number:
+            _, lines = next(pages)
+            data, start = [line.strip() for line in strip_page_header(lines)], 0
+        for line in data[start:]:
+            if line == DETAIL_MARKER:
+                if page != page_number:
+                    logging.info(f"Summary table continues to page {page}")
+                return table_lines
+            if not _is_table_chrome(line):
+                table_lines.append(line)
+
+    logging.error(f"Could not find table boundaries: no '{DETAIL_MARKER}' line")
+    return None
+
+
+def layout_key(document) -> str:
+    """Return a cheap identifier for the bill's page layout.
+
+    Built from the label lines (no digits) at the top of page 0, which is
+    already extracted for the billing month and total, so computing it costs
+    no extra page extraction. Bills of the same template share a key.
+    """
+    labels = [
+        line.strip()
+        for line in document.page_lines(0)[:12]
+        if not any(ch.isdigit() for ch in line)
+    ]
+    return hashlib.sha256("\n".join(labels).encode("utf-8")).hexdigest()[:16]
+
+
+class LayoutMemory:
+    """Persistent map of layout key to the page holding the summary table.
+
+    Args:
+        path: JSON file the discovered pages are stored in
+    """
+
+    def __init__(self, path=DEFAULT_LAYOUT_MEMORY_PATH):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self._pages = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._pages = {}
+
+    def get(self, key):
+        """Return the remembered summary page for a layout, or None."""
+        return self._pages.get(key)
+
+    def remember(self, key, page_number) -> None:
+        """Store the summary page for a layout if it changed.
+
+        The file is re-read first, so layouts remembered by runs that finished
+        since this one started are kept.
+        """
+        if self._pages.get(key) == page_number:
+            return
+        try:
+            with open(self.path, "r") as f:
+                self._pages = {**json.load(f), **self._pages}
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        self._pages[key] = page_number
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._pages, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save layout memory: {e}")
+
+
+def find_summary_page(document, preferred_pages=()):
+    """Return the index of the page containing the bill summary table.
+
+    Pages are extracted lazily: the preferred pages are checked first, then
+    the rest in order, stopping at the first page with the summary marker so
+    a long statement is never extracted in full.
+
+    Args:
+        document: BillDocument for the bill
+        preferred_pages: Page indexes to try before scanning in order
+
+    Returns:
+        int: Page index, or None if no page has the summary marker
+    """
+    candidates = []
+    for page_number in list(preferred_pages) + list(range(document.page_count)):
+        if page_number is None or page_number in candidates:
+            continue
+        if 0 <= page_number < document.page_count:
+            candidates.append(page_number)
+    for page_number, lines in document.iter_page_lines(candidates):
+        if any(line.strip() == SUMMARY_MARKER for line in lines):
+            return page_number
+    return None
+
+
+def locate_summary_page(document, configured_page, memory_path=None) -> int:
+    """Find the summary page, preferring the page last seen for this layout.
+
+    Args:
+        document: BillDocument for the bill
+        configured_page: page_number from configs.yml, tried after the
+            remembered page
+        memory_path: LayoutMemory file (default: DEFAULT_LAYOUT_MEMORY_PATH)
+
+    Returns:
+        int: Page index of the summary table, or configured_page if no page
+        has the summary marker
+    """
+    memory = LayoutMemory(memory_path or DEFAULT_LAYOUT_MEMORY_PATH)
+    key = layout_key(document)
+    page_number = find_summary_page(document, [memory.get(key), configured_page])
+    if page_number is None:
+        logging.warning(f"'{SUMMARY_MARKER}' not found on any page")
+        return configured_page
+    if page_number != configured_page:
+        logging.info(f"Summary table found on page {page_number}")
+    memory.remember(key, page_number)
+    return page_number
+
+
+def _check_row_count(rows, family_cnt):
+    # Validate we got the expected number of rows
+    expected_rows = family_cnt + 1  # family members + Account row
+    if len(rows) != expected_rows:
+        logging.warning(
+            f"Expected {expected_rows} rows but got {len(rows)}. "
+            f"Check family_count config setting."
+        )
+
+
+def get_bill_lines(document, page_number, family_cnt):
+    """Extract the billing summary table as typed BillLine rows.
+
+    General parser for any layout: searches for the table boundaries, follows
+    the table across pages and accepts any line type.
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Zero-based page index containing summary table (typically page 1)
+        family_cnt: Number of family members in the plan, used to validate table
+
+    Returns:
+        list: BillLine per row, Account row included.
+        None if the table boundaries could not be found
+    """
+    table_lines = get_summary_table_lines(document, page_number)
+    if table_lines is None:
+        return None
+    lines = [tokenize_summary_line(line, _GENERAL_ROW_PATTERN) for line in table_lines]
+    lines = [line for line in lines if line]
+    _check_row_count(lines, family_cnt)
+    return lines
+
+
+def layout_fingerprint(document, page_number) -> str:
+    """Return an identifier for the template of the bill's summary page.
+
+    Hashes the label lines (no digits) from the top of the summary page down
+    to the column header, together with the position of the title, so bills
+    whose table sits at the same offsets share a fingerprint.
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Zero-based index of the summary page
+
+    Returns:
+        str: Hex digest identifying the layout
+    """
+    data = [line.strip() for line in document.page_lines(page_number)]
+    try:
+        end = data.index(SUMMARY_MARKER) + 2  # title and column header
+    except ValueError:
+        end = min(len(data), 12)
+    structure = [str(end)]
+    structure += [line for line in data[:end] if not any(c.isdigit() for c in line)]
+    return hashlib.sha256("\n".join(structure).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class SummaryLayout:
+    """Parser for a known summary page template.
+
+    Knowing the template, the parser skips the boundary search and reads the
+    table rows at their fixed offset with the template's row pattern.
+
+    Attributes:
+        name: Human-readable template name for logs
+        first_row: Index of the Account row among the summary page's lines
+        row_pattern: Compiled pattern matching one table row
+    """
+
+    name: str
+    first_row: int
+    row_pattern: re.Pattern = _SUMMARY_ROW_PATTERN
+
+    def parse(self, document, page_number, family_cnt):
+        """Read the table rows at the template's fixed offset.
+
+        Args:
+            document: BillDocument for the bill
+            page_number: Zero-based index of the summary page
+            family_cnt: Number of family members in the plan
+
+        Returns:
+            list: BillLine per row, Account row included. None if the page
+            does not fit the template (wrong row count, table continuing on
+            the next page, unreadable row)
+        """
+        data = document.page_lines(page_number)
+        end = self.first_row + family_cnt + 1
+        if end >= len(data) or data[end].strip() != DETAIL_MARKER:
+            return None
+        lines = [
+            tokenize_summary_line(line.strip(), self.row_pattern)
+            for line in data[self.first_row : end]
+        ]
+        return None if None in lines else lines
+
+
+# Layout fingerprint -> parser for that template
+SUMMARY_LAYOUTS = {}
+
+
+def register_layout(fingerprint, layout) -> None:
+    """Register the parser for a summary page template.
+
+    Args:
+        fingerprint: layout_fingerprint() of a bill using the template
+        layout: SummaryLayout that parses it
+    """
+    SUMMARY_LAYOUTS[fingerprint] = layout
+
+
+# T-Mobile statement as of January 2025 (example_bill_summary): page header,
+# title, column header and totals row above the Account row
+register_layout("302973594181611c", SummaryLayout("T-Mobile 2025", first_row=9))
+
+
+def parse_summary_table(document, page_number, family_cnt):
+    """Extract the summary table with the parser registered for its layout.
+
+    Unknown layouts, and bills that do not fit their template, fall back to
+    the general parser get_bill_lines().
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Zero-based index of the summary page
+        family_cnt: Number of family members in the plan, used to validate table
+
+    Returns:
+        list: BillLine per row, Account row included.
+        None if the table boundaries could not be found
+    """
+    fingerprint = layout_fingerprint(document, page_number)
+    layout = SUMMARY_LAYOUTS.get(fingerprint)
+    if layout is None:
+        logging.info(f"Unknown layout {fingerprint}, using the general parser")
+    else:
+        lines = layout.parse(document, page_number, family_cnt)
+        if lines is not None:
+            logging.info(f"Summary table read with the {layout.name} parser")
+            return lines
+        logging.info(f"Bill does not fit the {layout.name} layout")
+    return get_bill_lines(document, page_number, family_cnt)
+
+
+class LineType(str, Enum):
+    """Line type column of the summary table.
+
+    A str subclass, so it compares equal to, and is stored in JSON and SQLite
+    as, the words printed on the bill. The Account row has no line type.
+    BillLine keeps types not listed here (the general parser accepts any
+    words, such as "Tablet") as the plain printed string.
+    """
+
+    ACCOUNT = ""
+    VOICE = "Voice"
+    MOBILE_INTERNET = "Mobile Internet"
+    WEARABLE = "Wearable"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+# Printed words -> LineType; a dict lookup is much cheaper than LineType(words)
+_LINE_TYPES = {line_type.value: line_type for line_type in LineType}
+
+
+@dataclass(slots=True)
+class BillLine:
+    """One row of the billing summary table with amounts in integer cents.
+
+    ``plans`` is 0 for lines whose plan is covered by the account plan;
+    those lines are flagged with ``included``. Rows are slotted (no per-row
+    __dict__) and phone numbers interned, since the same family's lines recur
+    on every bill when thousands of bills are held for history or batch runs.
+    """
+
+    cell_num: str
+    line_type: LineType  # or the printed words for types not in LineType
+    plans: int
+    equipment: int
+    services: int
+    one_time_charges: int
+    total: int
+    included: bool = False
+
+    def __post_init__(self):
+        self.cell_num = sys.intern(self.cell_num)
+        line_type = _LINE_TYPES.get(self.line_type)
+        if line_type is None:
+            line_type = sys.intern(str(self.line_type))
+        self.line_type = line_type
+
+
+@dataclass(slots=True)
+class MemberCharge:
+    """Amount owed by one member in integer cents.
+
+    Matches a row of the processed DataFrame.
+    """
+
+    member: str
+    total: int
+    plan_price: int
+    equipment: int
+    services: int
+    one_time_charges: int
+
+
+@dataclass(slots=True)
+class BillSummary:
+    """Processed bill: billing month, total due and per-member charges.
+
+    ``lines`` keeps the parsed summary table rows (Account row included), so
+    stored bills can be re-allocated later without the PDF.
+    """
+
+    bill_path: str
+    bill_month: str
+    total: int
+    members: list = field(default_factory=list)
+    issue_date: str = None
+    lines: list = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Return the summary as plain JSON-serializable data."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a summary from to_dict() output."""
+        members = [MemberCharge(**member) for member in data["members"]]
+        return cls(
+            data["bill_path"],
+            data["bill_month"],
+            data["total"],
+            members,
+            data.get("issue_date"),
+            [BillLine(**line) for line in data.get("lines", [])],
+        )
+
+
+def load_member_names() -> dict:
+    """Return the MEMBER_NAMES phone-to-name mapping from the environment."""
+    member_names = os.environ.get("MEMBER_NAMES")
+    return json.loads(member_names) if member_names is not None else {}
+
+
+def allocate_charges(lines, plan_cost_for_all_members, member_names=None):
+    """Split account-level charges across member lines.
+
+    Pandas-free counterpart of analyze_bill_text.process_text_to_dataframe,
+    implementing the same two billing strategies:
+    1. Split plan costs equally among all members
+    2. Charge included members shared cost and others individual plans
+
+    Shared amounts are divided with split_cents(), so the member totals always
+    add up to the account total to the cent.
+
+    Args:
+        lines: BillLine rows including the Account row
+        plan_cost_for_all_members: Boolean config flag from YAML
+        member_names: Optional phone-number-to-name mapping
+
+    Returns:
+        list: MemberCharge per member line, in bill order
+
+    Raises:
+        ValueError: If the Account row or member lines are missing
+    """
+    account = next((line for line in lines if line.cell_num == "Account"), None)
+    if account is None:
+        logging.error("Missing 'Account' row in input table")
+        raise ValueError("Invalid table format - no account summary row")
+
+    members = [line for line in lines if line.cell_num != "Account"]
+    total_members = len(members)
+    if total_members == 0:
+        raise ValueError("Invalid table format - no member lines")
+
+    if plan_cost_for_all_members:
+        total_plan_price = account.plans + sum(line.plans for line in members)
+        plan_prices = split_cents(total_plan_price, total_members)
+    else:  # included members pay different than other members
+        included_members = sum(1 for line in members if line.included)
+        included_shares = iter(
+            split_cents(account.plans, included_members) if included_members else []
+        )
+        plan_prices = [
+            next(included_shares) if line.included else line.plans for line in members
+        ]
+
+    # Distribute account-level charges equally among all members
+    equipment_shares = split_cents(account.equipment, total_members)
+    services_shares = split_cents(account.services, total_members)
+    one_time_shares = split_cents(account.one_time_charges, total_members)
+
+    member_names = member_names or {}
+    charges = []
+    for i, line in enumerate(members):
+        plan_price = plan_prices[i]
+        equipment = line.equipment + equipment_shares[i]
+        services = line.services + services_shares[i]
+        one_time = line.one_time_charges + one_time_shares[i]
+        charges.append(
+            MemberCharge(
+                member=member_names.get(line.cell_num, line.cell_num),
+                total=plan_price + equipment + services + one_time,
+                plan_price=plan_price,
+                equipment=equipment,
+                services=services,
+                one_time_charges=one_time,
+            )
+        )
+
+    total = sum(charge.total for charge in charges)
+    logging.info(f"Total bill sums up to {format_cents(total)}")
+    return charges
+
+
+def find_processed_bill(document, bill_month, yaml_data):
+    """Look the bill up in the history by its page 0 facts before parsing it.
+
+    The billing month, issue date and total due are all on the first page, so
+    this only costs that page's text. The stored bill is only used if it was
+    processed under the current config_hash(), so a changed configs.yml or
+    MEMBER_NAMES re-processes it.
+
+    Args:
+        document: BillDocument for the bill
+        bill_month: Billing month from get_bill_month()
+        yaml_data: Parsed configs.yml contents; ``skip_processed_bills: false``
+            or an empty history_path disables the lookup
+
+    Returns:
+        BillSummary: The stored summary, or None if the bill is not recorded
+    """
+    from bill_history import DEFAULT_HISTORY_PATH, BillHistory, bill_period
+
+    history_path = yaml_data.get("history_path", DEFAULT_HISTORY_PATH)
+    if not yaml_data.get("skip_processed_bills", True) or not history_path:
+        return None
+    if not os.path.exists(history_path):
+        return None
+    from bill_cache import config_hash
+
+    with profile_stage("history lookup"):
+        period = bill_period(bill_month, get_bill_issue_date(document))
+        if period is None:
+            return None
+        with BillHistory(history_path) as history:
+            summary = history.processed_bill(
+                period, get_total_from_bill(document), config_hash()
+            )
+    if summary is not None:
+        logging.info(f"Bill for {period} already processed; reusing the history")
+        summary.bill_path = document.path
+    return summary
+
+
+def analyze_bill(
+    bill_path, yaml_data, reuse_history=True, document=None
+) -> BillSummary:
+    """Run the extraction and allocation pipeline for one bill without pandas.
+
+    Args:
+        bill_path: Path to PDF file containing phone bill, or the PDF's bytes
+        yaml_data: Parsed configs.yml contents
+        reuse_history: Return the recorded result when the bill history already
+            has this bill under the current config (see find_processed_bill())
+        document: BillDocument already opened for bill_path, shared with the
+            caller's later stages; summary_page is set on it
+
+    Returns:
+        BillSummary: Processed bill
+
+    Raises:
+        ValueError: If the summary table could not be extracted
+        AssertionError: If member totals do not add up to the billed total
+    """
+    if document is None:
+        document = BillDocument(
+            bill_path,
+            yaml_data.get("text_engine", "pypdf"),
+            yaml_data.get("page_jobs", 1),
+        )
+    bill_month = get_bill_month(document, 0)
+    if reuse_history:
+        processed = find_processed_bill(document, bill_month, yaml_data)
+        if processed is not None:
+            return processed
+
+    memory_path = yaml_data.get("layout_memory_path")
+    region_mode = yaml_data.get("extraction_mode", "text") == "region"
+    lines = None
+    if region_mode:
+        from bill_regions import read_summary_region
+
+        found = read_summary_region(document, yaml_data["family_count"], memory_path)
+        if found is not None:
+            page_number, lines = found
+    if lines is None:
+        with profile_stage("summary page discovery"):
+            page_number = locate_summary_page(
+                document, yaml_data["page_number"], memory_path
+            )
+        with profile_stage("table row parsing"):
+            lines = parse_summary_table(
+                document, page_number, yaml_data["family_count"]
+            )
+        if lines is None:
+            raise ValueError("Could not extract the bill summary table")
+        if region_mode:
+            from bill_regions import remember_summary_region
+
+            remember_summary_region(document, page_number, lines, memory_path)
+    document.summary_page = page_number
+    with profile_stage("allocation"):
+        charges = allocate_charges(
+            lines, yaml_data["plan_cost_for_all_members"], load_member_names()
+        )
+
+    with profile_stage("verification"):
+        total_bill_raw = get_total_from_bill(document)
+        total_bill_processed = sum(charge.total for charge in charges)
+        assert total_bill_processed == total_bill_raw, (
+            f"Total bill does not match: {format_cents(total_bill_processed)} "
+            f"!= {format_cents(total_bill_raw)}"
+        )
+    return BillSummary(
+        document.path,
+        bill_month,
+        total_bill_raw,
+        charges,
+        get_bill_issue_date(document),
+        lines,
+    )
+
+
+def format_bill_summary(summary: BillSummary) -> str:
+    """Render the dot-leader bill summary printed for stdout capture.
+
+    Works directly on the in-memory summary, so no CSV has to be written and
+    read back, and the grand total is computed from numbers, not strings.
+    """
+    bill_month = summary.bill_month or "last month"
+    rows = [(m.member, format_cents(m.total)) for m in summary.members]
+    grand_total = sum(m.total for m in summary.members)
+
+    max_name_length = max((len(name) for name, _ in rows), default=0)
+    total_width = max(max_name_length + 20, 40)  # Ensure minimum width
+
+    out = [f"\nT-Mobile Bill Summary for {bill_month}\n"]
+    for name, total in rows:
+        # Add dot leaders between name and price
+        dots_needed = total_width - len(name) - len(total)
+        dots = "." * (max(dots_needed, 2) - 15)
+        out.append(f"{name} {dots} {total}")
+
+    grand = format_cents(grand_total)
+    dots = "." * (total_width - len("Grand Total") - len(grand) - 15)
+    out.append(f"\nGrand Total {dots} {grand}")
+    return "\n".join(out)
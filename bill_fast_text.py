@@ -0,0 +1,357 @@
+"""Fast page text extraction by scanning raw content-stream text operators.
+
+``page.extract_text()`` interprets every operator on the page through pypdf's
+generic content-stream parser. The pipeline only needs the text lines, so this
+engine tokenizes the decoded content stream with one regex, follows just the
+operators that place and show text (BT/ET, Tf, Tm, Td, TD, T*, TL, Tj, TJ, '
+and ", plus q/Q/cm and form XObjects), and decodes strings with each font's
+ToUnicode map or simple encoding. Line breaks and spaces follow the same rules
+as ``extract_text()``: a new line when the baseline moves by more than 0.8 of
+the font size, a space when a gap or TJ offset is at least half a space wide.
+
+Selected with ``--engine fast`` (``text_engine: fast`` in configs.yml). Its
+output can be compared with ``extract_text()`` on the benchmark corpus with
+``python benchmarks/run_benchmarks.py --cross-check``.
+"""
+
+import re
+
+from pypdf.generic import IndirectObject
+
+_TOKEN_PATTERN = re.compile(
+    rb"""[\s\x00]*(?:
+        (<<|>>|\[|\])
+      | <([0-9A-Fa-f\s]*)>
+      | \(((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*)\)
+      | /([^\s/\[\]()<>{}%]*)
+      | ([+-]?(?:\d+\.?\d*|\.\d+))
+      | ([A-Za-z'"*][A-Za-z0-9'"*]*)
+      | %[^\r\n]*
+    )""",
+    re.DOTALL | re.VERBOSE,
+)
+_LITERAL_ESCAPE = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.DOTALL)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+_BFCHAR_BLOCK = re.compile(rb"beginbfchar(.*?)endbfchar", re.DOTALL)
+_BFRANGE_BLOCK = re.compile(rb"beginbfrange(.*?)endbfrange", re.DOTALL)
+_CODESPACE_BLOCK = re.compile(rb"begincodespacerange(.*?)endcodespacerange", re.DOTALL)
+_HEX = re.compile(rb"<([0-9A-Fa-f\s]*)>")
+_RANGE_ENTRY = re.compile(
+    rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(?:<([0-9A-Fa-f]*)>|\[(.*?)\])",
+    re.DOTALL,
+)
+_SIMPLE_ENCODINGS = {
+    "/WinAnsiEncoding": "cp1252",
+    "/MacRomanEncoding": "mac_roman",
+    "/StandardEncoding": "latin-1",
+}
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _multiply(m, n):
+    """Product of two PDF matrices (a, b, c, d, e, f), m applied first."""
+    return (
+        m[0] * n[0] + m[1] * n[2],
+        m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2],
+        m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4],
+        m[4] * n[1] + m[5] * n[3] + n[5],
+    )
+
+
+def _translate(m, tx, ty):
+    """Move the origin of matrix m by (tx, ty) in its own coordinates."""
+    return (*m[:4], m[4] + tx * m[0] + ty * m[2], m[5] + tx * m[1] + ty * m[3])
+
+
+def _unescape_literal(raw: bytes) -> bytes:
+    def replace(match):
+        escaped = match.group(1)
+        if escaped[:1].isdigit():
+            return bytes([int(escaped, 8) & 0xFF])
+        if escaped in (b"\n", b"\r", b"\r\n"):
+            return b""  # line continuation
+        return _ESCAPES.get(escaped, escaped)
+
+    return _LITERAL_ESCAPE.sub(replace, raw) if b"\\" in raw else raw
+
+
+def _utf16(hex_digits: bytes) -> str:
+    return bytes.fromhex(hex_digits.decode()).decode("utf-16-be", "replace")
+
+
+class _FontDecoder:
+    """Turns the strings shown with one font into text and glyph widths."""
+
+    def __init__(self, font):
+        self.code_length = 2 if font.get("/Subtype") == "/Type0" else 1
+        self.to_unicode = None
+        self.encoding = "latin-1"
+        self.widths = {}
+        self.default_width = 0.0
+        if "/ToUnicode" in font:
+            self._read_cmap(font["/ToUnicode"].get_object().get_data())
+        else:
+            encoding = font.get("/Encoding")
+            if isinstance(encoding, IndirectObject):
+                encoding = encoding.get_object()
+            if hasattr(encoding, "get"):
+                encoding = encoding.get("/BaseEncoding", "/StandardEncoding")
+            self.encoding = _SIMPLE_ENCODINGS.get(encoding, "cp1252")
+        self._read_widths(font)
+        space = self._code_for(" ")
+        space_width = self.widths.get(space, 0.0) if space is not None else 0.0
+        # Same default and halving as extract_text()
+        self.half_space = (space_width or self.default_width or 500.0) / 2
+
+    def _read_cmap(self, data: bytes) -> None:
+        self.to_unicode = {}
+        codespace = _CODESPACE_BLOCK.search(data)
+        if codespace:
+            lengths = [len(h.strip()) // 2 for h in _HEX.findall(codespace.group(1))]
+            if lengths:
+                self.code_length = max(lengths)
+        for block in _BFCHAR_BLOCK.findall(data):
+            codes = _HEX.findall(block)
+            for source, target in zip(codes[::2], codes[1::2]):
+                self.to_unicode[int(source, 16)] = _utf16(target)
+        for block in _BFRANGE_BLOCK.findall(data):
+            for low, high, start, targets in _RANGE_ENTRY.findall(block):
+                low, high = int(low, 16), int(high, 16)
+                if targets:
+                    for offset, target in enumerate(_HEX.findall(targets)):
+                        self.to_unicode[low + offset] = _utf16(target)
+                    continue
+                first = int(start, 16)
+                width = len(start) // 2
+                for offset in range(high - low + 1):
+                    value = (first + offset).to_bytes(width, "big")
+                    self.to_unicode[low + offset] = value.decode("utf-16-be", "replace")
+
+    def _read_widths(self, font) -> None:
+        if font.get("/Subtype") == "/Type0":
+            descendant = font["/DescendantFonts"][0].get_object()
+            self.default_width = float(descendant.get("/DW", 1000))
+            entries = list(descendant.get("/W", []))
+            i = 0
+            while i + 1 < len(entries):
+                first, second = entries[i], entries[i + 1]
+                if isinstance(second, IndirectObject):
+                    second = second.get_object()
+                if isinstance(second, list):
+                    for offset, width in enumerate(second):
+                        self.widths[int(first) + offset] = float(width)
+                    i += 2
+                elif i + 2 < len(entries):
+                    for code in range(int(first), int(second) + 1):
+                        self.widths[code] = float(entries[i + 2])
+                    i += 3
+                else:
+                    break
+        elif "/Widths" in font:
+            first = int(font.get("/FirstChar", 0))
+            for offset, width in enumerate(font["/Widths"]):
+                self.widths[first + offset] = float(width)
+
+    def _code_for(self, char):
+        if self.to_unicode is None:
+            try:
+                return char.encode(self.encoding)[0]
+            except (UnicodeEncodeError, IndexError):
+                return None
+        return next(
+            (code for code, text in self.to_unicode.items() if text == char), None
+        )
+
+    def decode(self, data: bytes):
+        """Return (text, width in thousandths of the font size) of a string."""
+        n = self.code_length
+        if n == 1:
+            codes = list(data)
+        else:
+            codes = [
+                int.from_bytes(data[i : i + n], "big") for i in range(0, len(data), n)
+            ]
+        width = sum(self.widths.get(code, self.default_width) for code in codes)
+        if self.to_unicode is None:
+            return data.decode(self.encoding, "replace"), width
+        to_unicode = self.to_unicode
+        return "".join(to_unicode.get(code, "") for code in codes), width
+
+
+class FastTextExtractor:
+    """Content-stream text extractor shared by all pages of one document.
+
+    Font decoders are cached per font object, so fonts used on every page
+    are read once per document.
+    """
+
+    def __init__(self):
+        self._fonts = {}
+
+    def _decoder(self, fonts, name):
+        reference = fonts.raw_get(name) if hasattr(fonts, "raw_get") else None
+        key = (
+            (reference.idnum, reference.generation)
+            if isinstance(reference, IndirectObject)
+            else id(fonts[name])
+        )
+        decoder = self._fonts.get(key)
+        if decoder is None:
+            decoder = self._fonts[key] = _FontDecoder(fonts[name].get_object())
+        return decoder
+
+    def page_text(self, page) -> str:
+        """Return the text of a page with one line per baseline."""
+        self._out = []
+        self._line = []
+        self._last = None  # (x, y, scaled font size) where the last string ended
+        self._scan(page.get_contents(), page.get("/Resources"), _IDENTITY)
+        if self._line:
+            self._out.append("".join(self._line))
+        return "\n".join(self._out)
+
+    def _scan(self, contents, resources, ctm) -> None:
+        if contents is None:
+            return
+        data = contents.get_data()
+        resources = resources.get_object() if resources is not None else {}
+        fonts = resources.get("/Font", {})
+        if isinstance(fonts, IndirectObject):
+            fonts = fonts.get_object()
+        stack = []
+        decoder = None
+        font_size = 0.0
+        leading = 0.0
+        tm = tlm = _IDENTITY
+        operands = []
+        arrays = []
+        match_token = _TOKEN_PATTERN.match
+        pos, end = 0, len(data)
+        while pos < end:
+            match = match_token(data, pos)
+            if match is None or match.end() == pos:
+                pos += 1
+                continue
+            pos = match.end()
+            kind = match.lastindex
+            if kind is None:
+                continue  # comment or trailing whitespace
+            value = match.group(kind)
+            if kind == 1:
+                if value == b"[":
+                    arrays.append(operands)
+                    operands = []
+                elif value == b"]" and arrays:
+                    array, operands = operands, arrays.pop()
+                    operands.append(array)
+                continue
+            if kind == 2:
+                hex_digits = re.sub(rb"\s", b"", value).decode()
+                if len(hex_digits) % 2:
+                    hex_digits += "0"
+                operands.append(bytes.fromhex(hex_digits))
+                continue
+            if kind == 3:
+                operands.append(_unescape_literal(value))
+                continue
+            if kind == 4:
+                operands.append("/" + value.decode("latin-1"))
+                continue
+            if kind == 5:
+                operands.append(float(value))
+                continue
+
+            op = value
+            if op in (b"Tj", b"'", b'"', b"TJ"):
+                if op == b"'" or op == b'"':
+                    tlm = tm = _translate(tlm, 0.0, -leading)
+                if decoder is not None and operands:
+                    items = operands[-1] if op == b"TJ" else [operands[-1]]
+                    tm = self._show(items, decoder, font_size, tm, ctm)
+            elif op == b"Td" or op == b"TD":
+                if len(operands) >= 2:
+                    tx, ty = operands[-2], operands[-1]
+                    if op == b"TD":
+                        leading = -ty
+                    tlm = tm = _translate(tlm, tx, ty)
+            elif op == b"Tm":
+                if len(operands) >= 6:
+                    tlm = tm = tuple(operands[-6:])
+            elif op == b"T*":
+                tlm = tm = _translate(tlm, 0.0, -leading)
+            elif op == b"TL":
+                if operands:
+                    leading = operands[-1]
+            elif op == b"Tf":
+                if len(operands) >= 2 and operands[-2] in fonts:
+                    decoder = self._decoder(fonts, operands[-2])
+                    font_size = operands[-1]
+            elif op == b"BT":
+                tm = tlm = _IDENTITY
+            elif op == b"cm":
+                if len(operands) >= 6:
+                    ctm = _multiply(tuple(operands[-6:]), ctm)
+            elif op == b"q":
+                stack.append(ctm)
+            elif op == b"Q":
+                if stack:
+                    ctm = stack.pop()
+            elif op == b"Do":
+                if operands:
+                    self._form(resources, operands[-1], ctm)
+            elif op == b"ID":
+                close = data.find(b"EI", pos)
+                pos = end if close < 0 else close + 2
+            operands = []
+
+    def _form(self, resources, name, ctm) -> None:
+        xobjects = resources.get("/XObject")
+        if xobjects is None:
+            return
+        xobjects = xobjects.get_object()
+        if name not in xobjects:
+            return
+        form = xobjects[name].get_object()
+        if form.get("/Subtype") != "/Form":
+            return
+        matrix = tuple(float(v) for v in form.get("/Matrix", _IDENTITY))
+        self._scan(form, form.get("/Resources", resources), _multiply(matrix, ctm))
+
+    def _show(self, items, decoder, font_size, tm, ctm):
+        """Append shown strings to the output and return the advanced matrix."""
+        for item in items:
+            if isinstance(item, float):
+                if (
+                    abs(item) >= decoder.half_space * 0.95
+                    and self._line
+                    and not self._line[-1].endswith(" ")
+                ):
+                    self._line.append(" ")
+                tm = _translate(tm, -item / 1000 * font_size, 0.0)
+                continue
+            if not isinstance(item, bytes):
+                continue
+            text, width = decoder.decode(item)
+            m = _multiply(tm, ctm)
+            scale = (m[2] ** 2 + m[3] ** 2) ** 0.5
+            x, y = m[4], m[5]
+            if self._last is not None:
+                last_x, last_y, last_size = self._last
+                if abs(y - last_y) > 0.8 * min(last_size, font_size * scale):
+                    if self._line:
+                        self._out.append("".join(self._line))
+                        self._line = []
+                elif (
+                    x - last_x >= decoder.half_space / 1000 * font_size * scale
+                    and self._line
+                    and not self._line[-1].endswith(" ")
+                    and not text.startswith(" ")
+                ):
+                    self._line.append(" ")
+            self._line.append(text)
+            tm = _translate(tm, width / 1000 * font_size, 0.0)
+            m_end = _multiply(tm, ctm)
+            self._last = (m_end[4], m_end[5], font_size * scale)
+        return tm
@@ -0,0 +1,325 @@
+"""SQLite history of processed bills for per-member and year-to-date queries.
+
+Every processed bill is stored once per billing period, so re-processing the
+same bill replaces its rows instead of duplicating them. Amounts are stored in
+integer cents, like everywhere else in the pipeline.
+
+The history holds the bills of one account: bills carry no account number on
+their first page, so a bill of another account for an already stored period
+replaces that period. Keep a separate history_path per account. Each bill also records
+the config_hash() it was processed under, so a bill seen again with the same
+period, total and config can be returned without parsing its summary table.
+"""
+
+import calendar
+import logging
+import sqlite3
+
+from bill_engine import BillLine, BillSummary, MemberCharge
+
+DEFAULT_HISTORY_PATH = "bill_history.sqlite3"
+
+CHARGE_FIELDS = ["total", "plan_price", "equipment", "services", "one_time_charges"]
+_CHARGE_COLUMNS = ", ".join(CHARGE_FIELDS)
+_FROM_CHARGES = "FROM member_charges c JOIN bills b ON b.id = c.bill_id"
+LINE_FIELDS = [
+    "cell_num",
+    "line_type",
+    "plans",
+    "equipment",
+    "services",
+    "one_time_charges",
+    "total",
+    "included",
+]
+_LINE_COLUMNS = ", ".join(LINE_FIELDS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bills (
+    id INTEGER PRIMARY KEY,
+    period TEXT UNIQUE,
+    bill_month TEXT,
+    issue_date TEXT,
+    bill_path TEXT,
+    total INTEGER NOT NULL,
+    config_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS member_charges (
+    bill_id INTEGER NOT NULL REFERENCES bills(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    member TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    plan_price INTEGER NOT NULL,
+    equipment INTEGER NOT NULL,
+    services INTEGER NOT NULL,
+    one_time_charges INTEGER NOT NULL,
+    PRIMARY KEY (bill_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_member_charges_member
+    ON member_charges (member, bill_id);
+CREATE TABLE IF NOT EXISTS bill_lines (
+    bill_id INTEGER NOT NULL REFERENCES bills(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    cell_num TEXT NOT NULL,
+    line_type TEXT NOT NULL,
+    plans INTEGER NOT NULL,
+    equipment INTEGER NOT NULL,
+    services INTEGER NOT NULL,
+    one_time_charges INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    included INTEGER NOT NULL,
+    PRIMARY KEY (bill_id, position)
+);
+"""
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+
+
+def bill_period(bill_month, issue_date):
+    """Return the YYYY-MM billing period of a bill.
+
+    Bills name the month without a year, so the year comes from the issue
+    date. A month later in the year than the issue date (a December bill
+    issued in January) belongs to the previous year.
+
+    Args:
+        bill_month: Billing month name from get_bill_month(), e.g. "January"
+        issue_date: Issue date from get_bill_issue_date() as YYYY-MM-DD
+
+    Returns:
+        str: Period as YYYY-MM, or None if either value is missing
+    """
+    month = _MONTHS.get((bill_month or "").strip().lower())
+    if month is None or not issue_date:
+        return None
+    year, issue_month = int(issue_date[:4]), int(issue_date[5:7])
+    if month > issue_month:
+        year -= 1
+    return f"{year:04d}-{month:02d}"
+
+
+class BillHistory:
+    """SQLite store of bill totals, summary table lines and per-member charges.
+
+    Indexed by billing period (unique) and by member, so a member's history
+    and year-to-date totals are single indexed queries. Member charges are
+    keyed by their line's position on the bill, as several lines (a phone and
+    a watch) may map to the same member name. The summary table lines are
+    kept so the member charges can be re-allocated later.
+
+    Args:
+        path: Path to the SQLite database file
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def record(self, summary, config_hash=None) -> str:
+        """Store a processed bill, replacing an earlier copy of the same period.
+
+        Args:
+            summary: BillSummary from analyze_bill()
+            config_hash: bill_cache.config_hash() the bill was processed under
+
+        Returns:
+            str: Billing period the bill was stored under (None if unknown)
+        """
+        period = bill_period(summary.bill_month, summary.issue_date)
+        with self.connection:
+            if period is not None:
+                self._warn_other_account(period, summary.lines)
+                self.connection.execute("DELETE FROM bills WHERE period = ?", (period,))
+            cursor = self.connection.execute(
+                "INSERT INTO bills "
+                "(period, bill_month, issue_date, bill_path, total, config_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    period,
+                    summary.bill_month,
+                    summary.issue_date,
+                    summary.bill_path,
+                    summary.total,
+                    config_hash,
+                ),
+            )
+            self._insert_charges(cursor.lastrowid, summary.members)
+            self.connection.executemany(
+                f"INSERT INTO bill_lines (bill_id, position, {_LINE_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (cursor.lastrowid, position)
+                    + tuple(getattr(line, f) for f in LINE_FIELDS)
+                    for position, line in enumerate(summary.lines)
+                ],
+            )
+        logging.info(f"Recorded bill for {period or summary.bill_month} in {self.path}")
+        return period
+
+    def _warn_other_account(self, period, lines) -> None:
+        """Warn when a period is replaced by a bill with other phone lines."""
+        stored = {
+            cell_num
+            for (cell_num,) in self.connection.execute(
+                "SELECT l.cell_num FROM bill_lines l JOIN bills b "
+                "ON b.id = l.bill_id WHERE b.period = ?",
+                (period,),
+            )
+        }
+        if stored and lines and stored != {line.cell_num for line in lines}:
+            logging.warning(
+                f"Replacing the {period} bill with a bill for other phone lines; "
+                "the history holds one account"
+            )
+
+    def _insert_charges(self, bill_id, members) -> None:
+        self.connection.executemany(
+            f"INSERT INTO member_charges (bill_id, position, member, "
+            f"{_CHARGE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (bill_id, position, m.member)
+                + tuple(getattr(m, f) for f in CHARGE_FIELDS)
+                for position, m in enumerate(members)
+            ],
+        )
+
+    def processed_bill(self, period, total, config_hash):
+        """Return a stored bill if it was processed under the given config.
+
+        Args:
+            period: Billing period from bill_period()
+            total: Total due of the bill in cents
+            config_hash: Current bill_cache.config_hash()
+
+        Returns:
+            BillSummary: The stored summary (with its summary table lines), or
+            None if the period is not stored with this total and config
+        """
+        row = self.connection.execute(
+            "SELECT id, bill_path, bill_month, total, issue_date FROM bills "
+            "WHERE period = ? AND total = ? AND config_hash = ?",
+            (period, total, config_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        bill_id, *fields = row
+        members = [
+            MemberCharge(member, *values)
+            for member, *values in self.connection.execute(
+                f"SELECT member, {_CHARGE_COLUMNS} FROM member_charges "
+                "WHERE bill_id = ? ORDER BY position",
+                (bill_id,),
+            )
+        ]
+        lines = [
+            BillLine(*values[:-1], included=bool(values[-1]))
+            for values in self.connection.execute(
+                f"SELECT {_LINE_COLUMNS} FROM bill_lines "
+                "WHERE bill_id = ? ORDER BY position",
+                (bill_id,),
+            )
+        ]
+        return BillSummary(*fields[:3], members, fields[3], lines)
+
+    def bill_lines(self) -> tuple:
+        """Return the stored summary table lines of every bill.
+
+        Returns:
+            tuple: (bill_ids, lines, skipped): ids of the bills with stored
+            lines, oldest period first, their BillLine lists in the same order,
+            and the number of bills recorded without lines
+        """
+        columns = ", ".join(f"l.{f}" for f in LINE_FIELDS)
+        rows = self.connection.execute(
+            f"SELECT l.bill_id, {columns} FROM bill_lines l "
+            "JOIN bills b ON b.id = l.bill_id ORDER BY b.period, b.id, l.position"
+        ).fetchall()
+        bills = {}
+        for bill_id, *values in rows:
+            line = BillLine(*values[:-1], included=bool(values[-1]))
+            bills.setdefault(bill_id, []).append(line)
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM bills").fetchone()
+        return list(bills), list(bills.values()), count - len(bills)
+
+    def bill_totals(self) -> dict:
+        """Return the period and printed total of every stored bill.
+
+        Returns:
+            dict: Bill id -> (period, total in cents)
+        """
+        rows = self.connection.execute("SELECT id, period, total FROM bills")
+        return {bill_id: (period, total) for bill_id, period, total in rows}
+
+    def replace_member_charges(self, bill_ids, charges, config_hash=None) -> None:
+        """Replace the member charges of stored bills in one transaction.
+
+        Args:
+            bill_ids: Ids from bill_lines()
+            charges: MemberCharge list for each bill, in the same order
+            config_hash: bill_cache.config_hash() the charges were allocated
+                under, recorded on the bills
+        """
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE bills SET config_hash = ? WHERE id = ?",
+                [(config_hash, bill_id) for bill_id in bill_ids],
+            )
+            self.connection.executemany(
+                "DELETE FROM member_charges WHERE bill_id = ?",
+                [(bill_id,) for bill_id in bill_ids],
+            )
+            for bill_id, members in zip(bill_ids, charges):
+                self._insert_charges(bill_id, members)
+
+    def member_history(self, member) -> list:
+        """Return one member's charges per bill, oldest period first.
+
+        Charges of several lines mapped to the same member are summed per bill.
+
+        Args:
+            member: Member name (or phone number without a name mapping)
+
+        Returns:
+            list: (period, bill_month, total, plan_price, equipment, services,
+            one_time_charges) tuples
+        """
+        sums = ", ".join(f"SUM(c.{f})" for f in CHARGE_FIELDS)
+        return self.connection.execute(
+            f"SELECT b.period, b.bill_month, {sums} {_FROM_CHARGES} "
+            "WHERE c.member = ? GROUP BY b.id ORDER BY b.period",
+            (member,),
+        ).fetchall()
+
+    def year_to_date(self, year, member=None) -> list:
+        """Return summed charges per member for the billing periods of a year.
+
+        Args:
+            year: Calendar year of the billing periods
+            member: Restrict the result to this member
+
+        Returns:
+            list: (member, total, plan_price, equipment, services,
+            one_time_charges) tuples, sorted by member
+        """
+        sums = ", ".join(f"SUM(c.{f})" for f in CHARGE_FIELDS)
+        query = (
+            f"SELECT c.member, {sums} {_FROM_CHARGES} "
+            "WHERE b.period >= ? AND b.period < ?"
+        )
+        params = [f"{year:04d}-01", f"{year + 1:04d}-01"]
+        if member is not None:
+            query += " AND c.member = ?"
+            params.append(member)
+        query += " GROUP BY c.member ORDER BY c.member"
+        return self.connection.execute(query, params).fetchall()
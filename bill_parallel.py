@@ -0,0 +1,94 @@
+"""Parallel page text extraction for long statements.
+
+BillDocument.iter_page_texts() hands uncached pages to a process pool when
+``page_jobs`` is above 1. Each worker opens the PDF itself and keeps it open
+for the next page of the same bill: from its path, memory-mapped read-only
+so workers share the operating system's page cache, or, for bills received as
+bytes (the daemon), from a shared memory block written once by the parent.
+Only page indexes go to the workers and only page texts come back.
+
+Process pools are not available on iOS a-Shell, so page_jobs defaults to 1
+and everything stays serial there.
+"""
+
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+_pools = {}
+
+# Worker process state: ((source, engine), BillDocument) of the last bill opened
+_worker_state = None
+
+
+def page_pool(jobs: int) -> ProcessPoolExecutor:
+    """Return the process pool with ``jobs`` workers, starting it on first use.
+
+    Pools are kept for the life of the process, so the daemon and batch runs
+    pay worker startup once, and shut down at exit.
+    """
+    pool = _pools.get(jobs)
+    if pool is None:
+        pool = _pools[jobs] = ProcessPoolExecutor(max_workers=jobs)
+    return pool
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown(cancel_futures=True)
+    _pools.clear()
+
+
+def share_source(path):
+    """Describe a bill so worker processes can open it on their own.
+
+    Args:
+        path: Path of the PDF, or its bytes
+
+    Returns:
+        tuple: ("path", absolute path, mtime) or ("shm", block name, size),
+        and the SharedMemory block for bytes (None for paths). The caller
+        owns the block and must pass it to release_block() once the workers
+        are done with it.
+    """
+    if isinstance(path, str):
+        path = os.path.abspath(path)
+        return ("path", path, os.stat(path).st_mtime_ns), None
+    block = shared_memory.SharedMemory(create=True, size=max(len(path), 1))
+    block.buf[: len(path)] = path
+    return ("shm", block.name, len(path)), block
+
+
+def release_block(block) -> None:
+    """Close and unlink a block returned by share_source()."""
+    block.close()
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _open_source(source):
+    """Return what a worker passes to BillDocument for a shared source."""
+    if source[0] == "path":
+        return source[1]  # BillDocument memory-maps the file itself
+    # Pool workers share the parent's resource tracker, so attaching does not
+    # hand the block's cleanup to this process; the parent unlinks it
+    block = shared_memory.SharedMemory(name=source[1])
+    try:
+        return bytes(block.buf[: source[2]])
+    finally:
+        block.close()
+
+
+def extract_page(source, page_number: int, text_engine: str) -> str:
+    """Worker entry point: return the text of one page of a shared bill."""
+    global _worker_state
+    from bill_engine import BillDocument
+
+    key = (source, text_engine)
+    if _worker_state is None or _worker_state[0] != key:
+        _worker_state = (key, BillDocument(_open_source(source), text_engine))
+    return _worker_state[1].page_text(page_number, cache=False)
@@ -0,0 +1,97 @@
+"""Stage-level timing and memory instrumentation for ``main.py --profile``.
+
+Stages are wrapped in ``profile_stage(name)``, which is a no-op until a
+profiler is enabled, so the instrumentation costs nothing on normal runs.
+Each stage records wall time and the tracemalloc peak above the memory in use
+when the stage started. Stages can nest (page text extraction happens inside
+page discovery and table parsing), so times are inclusive and a repeated stage
+name accumulates its time and keeps its largest peak.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_active_profiler = None
+
+
+class StageProfiler:
+    """Collects wall time and tracemalloc peak per named stage."""
+
+    def __init__(self):
+        self.records = {}
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block and record its memory peak under name."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # reset_peak() below would lose the parent's peak so far
+            self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+        self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+            frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], frame["peak"])
+            record = self.records.setdefault(
+                name, {"stage": name, "calls": 0, "seconds": 0.0, "peak_bytes": 0}
+            )
+            record["calls"] += 1
+            record["seconds"] += elapsed
+            record["peak_bytes"] = max(
+                record["peak_bytes"], frame["peak"] - frame["start"]
+            )
+
+    def format_table(self) -> str:
+        """Render the recorded stages as a fixed-width table."""
+        lines = [f"{'Stage':<28}{'Calls':>6}{'Time (ms)':>12}{'Peak (KiB)':>12}"]
+        for record in self.records.values():
+            lines.append(
+                f"{record['stage']:<28}{record['calls']:>6}"
+                f"{record['seconds'] * 1000:>12.1f}{record['peak_bytes'] / 1024:>12.1f}"
+            )
+        return "\n".join(lines)
+
+    def format_json_lines(self) -> str:
+        """Render the recorded stages as one JSON object per line."""
+        return "\n".join(json.dumps(record) for record in self.records.values())
+
+    def report(self, fmt="table", stream=None) -> None:
+        """Write the report, to stderr by default so stdout stays clean."""
+        text = self.format_json_lines() if fmt == "json" else self.format_table()
+        print(text, file=stream or sys.stderr)
+
+
+def enable_profiling() -> StageProfiler:
+    """Start recording stages and return the active profiler."""
+    global _active_profiler
+    _active_profiler = StageProfiler()
+    return _active_profiler
+
+
+def disable_profiling() -> None:
+    """Stop recording stages; profile_stage() is a no-op again."""
+    global _active_profiler
+    _active_profiler = None
+
+
+@contextmanager
+def profile_stage(name):
+    """Record the enclosed block as a stage if profiling is enabled."""
+    if _active_profiler is None:
+        yield
+        return
+    with _active_profiler.stage(name):
+        yield
@@ -0,0 +1,257 @@
+"""Region extraction of the summary table from positioned text fragments.
+
+``page.extract_text()`` lays out the whole page and the table is then split
+back into cells with regexes. Here pypdf's ``visitor_text`` callback collects
+the individual text fragments with their positions instead: only fragments
+below the table's column header are kept, extraction stops at the DETAILED
+CHARGES heading, rows are grouped by y and cells are assigned to columns by x.
+A cell containing spaces stays one cell because its fragment is never split.
+
+The table region (summary page, column header y and column boundaries) is
+learned from a bill whose table was parsed in text mode and remembered per
+layout, so later bills of the same layout go straight to the region.
+"""
+
+import logging
+import re
+from dataclasses import asdict, dataclass
+
+from bill_engine import (
+    CHARGE_COLUMNS,
+    DEFAULT_LAYOUT_MEMORY_PATH,
+    DETAIL_MARKER,
+    SUMMARY_MARKER,
+    LayoutMemory,
+    bill_line_from_cells,
+    layout_key,
+)
+from bill_profile import profile_stage
+
+_PHONE_PATTERN = re.compile(r"\((\d+)\)\s*(\d+)-(\d+)")
+_ROW_TOLERANCE = 2.0  # points of y difference still counted as the same row
+
+
+@dataclass
+class TextFragment:
+    """One piece of text drawn on a page, at its baseline start position."""
+
+    x: float
+    y: float
+    text: str
+
+
+@dataclass
+class TableRegion:
+    """Where a layout prints its summary table.
+
+    Attributes:
+        page: Page index of the summary table
+        top: y of the column header; rows are the fragments below it
+        columns: x where each column after the phone number starts: line
+            type, then the CHARGE_COLUMNS in order
+    """
+
+    page: int
+    top: float
+    columns: list
+
+
+class _TableEnd(Exception):
+    """Raised from the visitor to stop extraction at DETAILED CHARGES."""
+
+
+def page_fragments(page, top=None) -> list:
+    """Collect the non-blank text fragments of a page with their positions.
+
+    Args:
+        page: pypdf page object
+        top: Only keep fragments below this y; extraction then stops at the
+            first DETAILED CHARGES heading below it
+
+    Returns:
+        list: TextFragment objects in content-stream order
+    """
+    fragments = []
+
+    def visit(text, cm, tm, font_dict, font_size):
+        text = text.replace("\xa0", " ").strip()
+        if not text:
+            return
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        if top is not None and y >= top:
+            return
+        fragments.append(TextFragment(tm[4] * cm[0] + tm[5] * cm[2] + cm[4], y, text))
+        if top is not None and text == DETAIL_MARKER:
+            raise _TableEnd
+
+    try:
+        page.extract_text(visitor_text=visit)
+    except _TableEnd:
+        pass
+    return fragments
+
+
+def _table_rows(fragments, top) -> list:
+    """Group the fragments between the column header and DETAILED CHARGES.
+
+    Returns:
+        list: Rows top to bottom, each a list of fragments sorted by x, or
+        None if DETAILED CHARGES is not below the header
+    """
+    bottom = max(
+        (f.y for f in fragments if f.text == DETAIL_MARKER and f.y < top),
+        default=None,
+    )
+    if bottom is None:
+        return None
+    rows = []
+    for fragment in sorted(
+        (f for f in fragments if bottom < f.y < top), key=lambda f: (-f.y, f.x)
+    ):
+        if rows and rows[-1][0].y - fragment.y <= _ROW_TOLERANCE:
+            rows[-1].append(fragment)
+        else:
+            rows.append([fragment])
+    return [sorted(row, key=lambda f: f.x) for row in rows]
+
+
+def _row_cells(row, columns) -> list:
+    """Assign a row's fragments to the identity column and the columns."""
+    cells = [[] for _ in range(len(columns) + 1)]
+    for fragment in row:
+        index = sum(fragment.x >= boundary for boundary in columns)
+        cells[index].append(fragment.text)
+    return [" ".join(cell) for cell in cells]
+
+
+def _row_to_bill_line(cells):
+    identity, line_type, charges = cells[0], cells[1], cells[2:]
+    if identity == "Account":
+        cell_num = "Account"
+    else:
+        match = _PHONE_PATTERN.fullmatch(identity)
+        if match is None:
+            return None
+        cell_num = "({}) {}-{}".format(*match.groups())
+    return bill_line_from_cells(cell_num, line_type, charges)
+
+
+def region_bill_lines(fragments, region, family_cnt):
+    """Build the BillLines of the summary table from positioned fragments.
+
+    Args:
+        fragments: Output of page_fragments() for the summary page
+        region: TableRegion of the bill's layout
+        family_cnt: Number of family members (expected phone lines)
+
+    Returns:
+        list: BillLine objects, or None if the rows found are not the
+        family_cnt phone lines plus the Account row
+    """
+    rows = _table_rows(fragments, region.top)
+    if rows is None:
+        return None
+    lines = []
+    for row in rows:
+        line = _row_to_bill_line(_row_cells(row, region.columns))
+        if line is not None:
+            lines.append(line)
+    if len(lines) != family_cnt + 1:
+        return None
+    return lines
+
+
+def learn_table_region(fragments, page_number, expected_lines):
+    """Derive the table region of a page from its text-mode parse.
+
+    The column header is the line right below THIS BILL SUMMARY. Column
+    boundaries are put halfway between the right-most start of one column and
+    the left-most start of the next, over all rows that have a fragment in
+    every column. The region is only returned if reading the page with it
+    gives exactly the rows text mode found.
+
+    Args:
+        fragments: Output of page_fragments() for the whole summary page
+        page_number: Index of the summary page
+        expected_lines: BillLines parsed from the page in text mode
+
+    Returns:
+        TableRegion: The learned region, or None if it cannot be learned
+    """
+    title = next((f for f in fragments if f.text == SUMMARY_MARKER), None)
+    if title is None:
+        return None
+    top = max((f.y for f in fragments if f.y < title.y), default=None)
+    if top is None:
+        return None
+    rows = _table_rows(fragments, top)
+    if not rows:
+        return None
+    width = len(CHARGE_COLUMNS) + 2
+    starts = [[] for _ in range(width)]
+    for row in rows:
+        if len(row) == width:
+            for column, fragment in enumerate(row):
+                starts[column].append(fragment.x)
+    if not all(starts):
+        return None
+    columns = [
+        round((max(starts[i - 1]) + min(starts[i])) / 2, 1) for i in range(1, width)
+    ]
+    region = TableRegion(page_number, top, columns)
+    if region_bill_lines(fragments, region, len(expected_lines) - 1) != list(
+        expected_lines
+    ):
+        return None
+    return region
+
+
+def read_summary_region(document, family_cnt, memory_path=None):
+    """Read the summary table from the region remembered for the bill's layout.
+
+    Args:
+        document: BillDocument for the bill
+        family_cnt: Number of family members (expected phone lines)
+        memory_path: LayoutMemory file (default: DEFAULT_LAYOUT_MEMORY_PATH)
+
+    Returns:
+        tuple: (page_number, BillLines), or None if no region is known for
+        the layout or the region did not yield a valid table
+    """
+    if getattr(document, "reader", None) is None:
+        return None
+    memory = LayoutMemory(memory_path or DEFAULT_LAYOUT_MEMORY_PATH)
+    stored = memory.get(f"region:{layout_key(document)}")
+    if stored is None or stored["page"] >= document.page_count:
+        return None
+    region = TableRegion(**stored)
+    with profile_stage("region extraction"):
+        fragments = page_fragments(document.reader.pages[region.page], region.top)
+        lines = region_bill_lines(fragments, region, family_cnt)
+    if lines is None:
+        logging.info("Remembered table region did not match; using text mode")
+        return None
+    logging.info(f"Summary table read from its region on page {region.page}")
+    return region.page, lines
+
+
+def remember_summary_region(document, page_number, lines, memory_path=None):
+    """Learn the table region from a text-mode parse and store it for the layout.
+
+    Args:
+        document: BillDocument for the bill
+        page_number: Index of the summary page
+        lines: BillLines parsed from that page in text mode
+        memory_path: LayoutMemory file (default: DEFAULT_LAYOUT_MEMORY_PATH)
+    """
+    if getattr(document, "reader", None) is None:
+        return
+    with profile_stage("region learning"):
+        fragments = page_fragments(document.reader.pages[page_number])
+        region = learn_table_region(fragments, page_number, lines)
+    if region is None:
+        logging.info("Summary table has no fixed cell positions; staying in text mode")
+        return
+    LayoutMemory(memory_path or DEFAULT_LAYOUT_MEMORY_PATH).remember(
+        f"region:{layout_key(document)}", asdict(region)
+    )
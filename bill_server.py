@@ -0,0 +1,182 @@
+"""Resident bill-processing daemon and its wire protocol.
+
+``main.py --serve`` keeps one warm interpreter listening on a Unix socket, so
+each Share Sheet run skips Python startup and the pypdf/yaml imports. Clients
+(see bill_client.py) send a JSON header line, optionally followed by the PDF
+bytes, and receive a JSON reply line with the formatted summary.
+
+Only the standard library is imported at module level so the thin client
+stays cheap to start; the bill pipeline is supplied by main.py as a handler.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+
+DEFAULT_SOCKET_PATH = ".bill_server.sock"
+
+
+def send_message(stream, header: dict, payload: bytes = b"") -> None:
+    """Write a JSON header line followed by an optional binary payload."""
+    header = dict(header, length=len(payload))
+    stream.write(json.dumps(header).encode("utf-8") + b"\n")
+    if payload:
+        stream.write(payload)
+    stream.flush()
+
+
+def read_message(stream):
+    """Read a message written by send_message().
+
+    Returns:
+        tuple: (header dict, payload bytes)
+
+    Raises:
+        ConnectionError: If the peer closed the connection before a full message
+    """
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed before a message was received")
+    header = json.loads(line)
+    payload = stream.read(header.get("length", 0)) if header.get("length") else b""
+    if len(payload) != header.get("length", 0):
+        raise ConnectionError("Connection closed in the middle of a message")
+    return header, payload
+
+
+def request_summary(socket_path, pdf_path=None, pdf_bytes=None, no_cache=False):
+    """Ask a running daemon for the formatted summary of one bill.
+
+    Args:
+        socket_path: Path of the daemon's Unix socket
+        pdf_path: Path of the PDF, resolved to an absolute path for the daemon
+        pdf_bytes: PDF contents, sent instead of a path
+        no_cache: Re-process the bill even if a cached summary exists
+
+    Returns:
+        dict: Reply with "ok" and either "output" or "error"
+
+    Raises:
+        OSError: If no daemon is listening on socket_path
+    """
+    header = {"no_cache": no_cache}
+    if pdf_path is not None:
+        header["path"] = os.path.abspath(pdf_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            send_message(stream, header, pdf_bytes or b"")
+            reply, _ = read_message(stream)
+    return reply
+
+
+class ConfigWatcher:
+    """configs.yml and .env loaded once and reloaded when their mtimes change.
+
+    MEMBER_NAMES from .env is applied to os.environ, where the engine and the
+    cache key read it; if it disappears from .env the value the process
+    inherited from its environment is restored.
+
+    Args:
+        load_config: Callable returning the parsed config for a path
+        config_path: Path to configs.yml
+        env_path: Path to the .env file with MEMBER_NAMES
+        inherited_member_names: MEMBER_NAMES from the process environment
+            before .env was loaded
+    """
+
+    def __init__(
+        self,
+        load_config,
+        config_path="configs.yml",
+        env_path=".env",
+        inherited_member_names=None,
+    ):
+        self.load_config = load_config
+        self.config_path = config_path
+        self.env_path = env_path
+        self._inherited_member_names = inherited_member_names
+        self._mtimes = {}
+        self._config = None
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> dict:
+        """Return the config, reloading whichever file changed since last call."""
+        config_mtime = self._mtime(self.config_path)
+        if self._config is None or config_mtime != self._mtimes.get("config"):
+            logging.info(f"Loading {self.config_path}")
+            self._config = self.load_config(self.config_path)
+            self._mtimes["config"] = config_mtime
+
+        env_mtime = self._mtime(self.env_path)
+        if "env" not in self._mtimes or env_mtime != self._mtimes["env"]:
+            self._reload_member_names(env_mtime is not None)
+            self._mtimes["env"] = env_mtime
+        return self._config
+
+    def _reload_member_names(self, env_exists):
+        member_names = None
+        if env_exists:
+            from dotenv import dotenv_values
+
+            logging.info(f"Loading {self.env_path}")
+            member_names = dotenv_values(self.env_path).get("MEMBER_NAMES")
+        if member_names is None:
+            member_names = self._inherited_member_names
+        if member_names is None:
+            os.environ.pop("MEMBER_NAMES", None)
+        else:
+            os.environ["MEMBER_NAMES"] = member_names
+
+
+def serve(handle, watcher, socket_path=DEFAULT_SOCKET_PATH) -> None:
+    """Serve bill requests on a Unix socket until interrupted.
+
+    Requests are handled one at a time, so the cache and layout memory are
+    never written concurrently.
+
+    Args:
+        handle: Callable (source, yaml_data, no_cache) returning the summary
+            text, where source is a PDF path or the PDF bytes
+        watcher: ConfigWatcher supplying the current config
+        socket_path: Path of the Unix socket to listen on
+    """
+
+    class BillRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                header, payload = read_message(self.rfile)
+            except (ConnectionError, ValueError) as e:
+                logging.warning(f"Bad request: {e}")
+                return
+            source = payload if payload else header.get("path")
+            try:
+                yaml_data = watcher.current()
+                if not yaml_data:
+                    raise ValueError("could not read configs.yml")
+                output = handle(source, yaml_data, header.get("no_cache", False))
+                reply = {"ok": True, "output": output}
+            except FileNotFoundError:
+                reply = {"ok": False, "error": f"Error: PDF file not found: {source}"}
+            except Exception as e:
+                reply = {"ok": False, "error": f"Error processing bill: {e}"}
+            send_message(self.wfile, reply)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket from a previous daemon
+    with socketserver.UnixStreamServer(socket_path, BillRequestHandler) as server:
+        print(f"Serving bill summaries on {socket_path} (Ctrl-C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
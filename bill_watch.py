@@ -0,0 +1,218 @@
+"""Drop-folder ingestion: process new PDF bills as they appear in a directory.
+
+``main.py watch DIR`` runs an asyncio loop that rescans the folder every poll
+interval, or as soon as inotify reports a file written or moved in where it
+is available (Linux). A new PDF is only dispatched once its size and mtime
+have stayed the same for the settle time and it ends with the %%EOF marker,
+so files still being copied or synced are left alone. Ready bills go through
+a queue to a fixed set of workers sharing one process pool, so a burst of
+dozens of PDFs is worked off ``jobs`` at a time by the same processes.
+
+Only the standard library is imported here; the bill pipeline is supplied by
+main.py, like the daemon's handler in bill_server.py.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_SETTLE_TIME = 2.0
+
+# inotify events that can mean a new complete file in the folder
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_PDF_TRAILER_BYTES = 1024
+
+
+def _ends_with_eof_marker(path) -> bool:
+    """Whether the last bytes of a file hold the PDF %%EOF marker."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(os.path.getsize(path) - _PDF_TRAILER_BYTES, 0))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+class DropFolder:
+    """Debounced view of the PDF files in a directory.
+
+    Each scan() compares every PDF's size and mtime with the previous scan.
+    A file is returned once, after both stayed unchanged for ``settle_time``;
+    it is returned again only if it is replaced with different content.
+
+    Args:
+        directory: Folder to watch
+        settle_time: Seconds a file must stay unchanged before it is ready
+        is_processed: Optional callable (path) -> bool for files that were
+            handled before the watcher started
+    """
+
+    def __init__(self, directory, settle_time=DEFAULT_SETTLE_TIME, is_processed=None):
+        self.directory = directory
+        self.settle_time = settle_time
+        self.is_processed = is_processed
+        self._pending = {}  # path -> ((size, mtime), time first seen so)
+        self._dispatched = {}  # path -> (size, mtime) when it was returned
+
+    @property
+    def pending(self) -> int:
+        """Number of files waiting to settle."""
+        return len(self._pending)
+
+    def scan(self, now: float) -> list:
+        """Return the PDFs that became ready since the last scan.
+
+        Args:
+            now: Current monotonic time in seconds
+
+        Returns:
+            list: Paths of settled, complete PDFs, sorted by name
+        """
+        ready = []
+        present = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(".") or not name.lower().endswith(".pdf"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                present.add(entry.path)
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self._dispatched.get(entry.path) == signature:
+                    continue
+                if entry.path not in self._dispatched and self.is_processed:
+                    if self.is_processed(entry.path):
+                        self._dispatched[entry.path] = signature
+                        continue
+                seen = self._pending.get(entry.path)
+                if seen is None or seen[0] != signature:
+                    self._pending[entry.path] = (signature, now)
+                elif (
+                    now - seen[1] >= self.settle_time
+                    and stat.st_size
+                    and _ends_with_eof_marker(entry.path)
+                ):
+                    del self._pending[entry.path]
+                    self._dispatched[entry.path] = signature
+                    ready.append(entry.path)
+
+        for path in set(self._pending).difference(present):
+            del self._pending[path]
+        for path in set(self._dispatched).difference(present):
+            del self._dispatched[path]
+        return sorted(ready)
+
+
+def _inotify_fd(directory):
+    """Return a non-blocking inotify descriptor watching directory, or None.
+
+    inotify is reached through ctypes, so platforms without it (macOS, iOS
+    a-Shell) simply fall back to polling.
+    """
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (ImportError, OSError, AttributeError):
+        return None
+    fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+    if inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _drain(fd, wakeup: asyncio.Event) -> None:
+    """Discard pending inotify events and wake the scanner."""
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+    wakeup.set()
+
+
+async def watch(
+    directory,
+    make_job,
+    finish,
+    jobs=1,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+    settle_time=DEFAULT_SETTLE_TIME,
+    is_processed=None,
+) -> None:
+    """Process PDFs dropped into a folder until cancelled.
+
+    Args:
+        directory: Folder to watch
+        make_job: Callable (path) returning a picklable zero-argument callable
+            that processes the bill in a pool worker; called when the bill is
+            dispatched, so it can pick up the current config
+        finish: Callable (path, result, error) run in this process after each
+            bill, with the job's return value or the exception it raised
+        jobs: Number of pool worker processes (bills processed at once)
+        poll_interval: Seconds between rescans when nothing is settling
+        settle_time: Seconds a file must stay unchanged before processing
+        is_processed: Optional callable (path) -> bool for files handled
+            before the watcher started
+    """
+    loop = asyncio.get_running_loop()
+    folder = DropFolder(directory, settle_time, is_processed)
+    queue = asyncio.Queue()
+    wakeup = asyncio.Event()
+
+    async def worker(pool):
+        while True:
+            path = await queue.get()
+            try:
+                result = await loop.run_in_executor(pool, make_job(path))
+            except Exception as e:
+                finish(path, None, e)
+            else:
+                finish(path, result, None)
+            finally:
+                queue.task_done()
+
+    fd = _inotify_fd(directory)
+    if fd is not None:
+        loop.add_reader(fd, _drain, fd, wakeup)
+    mode = "inotify" if fd is not None else f"polling every {poll_interval:g}s"
+    print(f"Watching {directory} for PDF bills ({mode}, Ctrl-C to stop)", flush=True)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        workers = [asyncio.create_task(worker(pool)) for _ in range(jobs)]
+        try:
+            while True:
+                for path in folder.scan(loop.time()):
+                    logging.info(f"Dispatching {path}")
+                    queue.put_nowait(path)
+                wakeup.clear()
+                # re-check soon while files are settling, else wait for events
+                timeout = poll_interval
+                if folder.pending:
+                    timeout = min(poll_interval, settle_time)
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in workers:
+                task.cancel()
+            if fd is not None:
+                loop.remove_reader(fd)
+                os.close(fd)
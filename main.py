@@ -6,98 +6,713 @@ Designed for iOS a-Shell execution with Share Sheet integration.
 
 Usage:
     python main.py /path/to/bill.pdf
+    python main.py - < /path/to/bill.pdf
+    python main.py --export /path/to/bill.pdf
+    python main.py --batch /path/to/bills --jobs 4
+    python main.py --engine fast /path/to/bill.pdf
+    python main.py --serve  (then: python bill_client.py /path/to/bill.pdf)
+    python main.py history --member Alice --year 2025
+    python main.py history --reallocate
+    python main.py watch /path/to/drop-folder --jobs 4
+
+The default path runs on bill_engine and never imports pandas or numpy, which
+dominate startup time on a-Shell. pandas is only loaded for --export, which
+also writes the intermediate CSVs to a new per-run folder under attachments/.
 """
 
-from analyze_bill_text import main as analyze_bill_text
+from bill_engine import (
+    TEXT_ENGINES,
+    BillDocument,
+    BillSummary,
+    analyze_bill,
+    cents_to_dollars,
+    format_bill_summary,
+    format_cents,
+    load_member_names,
+    locate_summary_page,
+    read_yaml_file,
+)
+from bill_cache import BillCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES, config_hash
+from bill_history import BillHistory, DEFAULT_HISTORY_PATH
+from bill_profile import enable_profiling, profile_stage
+from bill_server import DEFAULT_SOCKET_PATH
 
+import argparse
+import csv
+import datetime
+import functools
+import glob
 import sys
+import time
 import os
 import logging
-import pandas as pd
-from tabulate import tabulate
 from dotenv import load_dotenv
 
 # Suppress all logging for clean stdout output
 logging.disable(logging.CRITICAL)
 
+SUMMARY_COLUMNS = [
+    "member",
+    "total",
+    "plan_price",
+    "equipment",
+    "services",
+    "one_time_charges",
+]
+
 
-def print_bill_summary(summary_csv_path: str, bill_month_file: str = "billing_month.txt") -> None:
+def print_bill_summary(summary: BillSummary) -> None:
     """Print formatted bill summary for stdout capture.
 
     Args:
-        summary_csv_path: Path to the summary CSV file
-        bill_month_file: Path to the billing month text file
+        summary: Processed bill from bill_engine.analyze_bill() or
+            analyze_bill_text.main()
+    """
+    with profile_stage("output"):
+        print(format_bill_summary(summary))
+
+
+def print_detailed_charges(document: BillDocument, yaml_data: dict) -> None:
+    """Print the DETAILED CHARGES section itemized per line.
+
+    Args:
+        document: BillDocument of the bill, shared with the summary run so its
+            pages and summary_page are reused
+        yaml_data: Parsed configs.yml contents
+    """
+    from bill_details import format_detailed_charges, summarize_detailed_charges
+
+    page_number = document.summary_page
+    if page_number is None:  # summary came from the cache or the history
+        with profile_stage("summary page discovery"):
+            page_number = locate_summary_page(
+                document, yaml_data["page_number"], yaml_data.get("layout_memory_path")
+            )
+    with profile_stage("detailed charges"):
+        details = summarize_detailed_charges(document, page_number)
+    with profile_stage("output"):
+        print(format_detailed_charges(details, load_member_names()))
+
+
+def dot_line(name: str, amount: int) -> str:
+    """Return a "name ..... $amount" line for the batch and history reports."""
+    total = format_cents(amount)
+    return f"{name} {'.' * max(40 - len(name) - len(total), 2)} {total}"
+
+
+def record_history(summaries: list, yaml_data: dict) -> None:
+    """Store processed bills in the SQLite history configured in configs.yml.
+
+    Args:
+        summaries: BillSummary results to record
+        yaml_data: Parsed configs.yml contents; an empty history_path disables
+            recording
+    """
+    history_path = yaml_data.get("history_path", DEFAULT_HISTORY_PATH)
+    if not history_path:
+        return
+    with profile_stage("history"):
+        config = config_hash()
+        with BillHistory(history_path) as history:
+            for summary in summaries:
+                history.record(summary, config)
+
+
+def write_batch_summary(results: list, output_path: str) -> None:
+    """Write the combined per-member summary of a batch run to CSV.
+
+    Args:
+        results: BillSummary results from analyze_bill(), in input order
+        output_path: Path of the combined CSV file
+    """
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["bill", "bill_month"] + SUMMARY_COLUMNS)
+        for result in results:
+            bill = os.path.basename(result.bill_path)
+            for member in result.members:
+                amounts = [getattr(member, c) for c in SUMMARY_COLUMNS[1:]]
+                writer.writerow(
+                    [bill, result.bill_month, member.member]
+                    + [cents_to_dollars(amount) for amount in amounts]
+                )
+
+
+def read_config(path: str = "configs.yml", overrides: dict = None) -> dict:
+    """Read configs.yml, applying the command line overrides that were given.
+
+    Args:
+        path: Path to configs.yml
+        overrides: Config keys set on the command line; None values are skipped
+    """
+    yaml_data = read_yaml_file(path)
+    if yaml_data and overrides:
+        yaml_data.update({k: v for k, v in overrides.items() if v is not None})
+    return yaml_data
+
+
+def config_overrides(args: argparse.Namespace) -> dict:
+    """Return the configs.yml keys overridden by command line options."""
+    return {"text_engine": args.engine, "page_jobs": args.page_jobs}
+
+
+def run_batch(
+    bill_dir: str, jobs: int, output_path: str, overrides: dict = None
+) -> int:
+    """Process every PDF bill in a directory across a process pool.
+
+    Each worker runs the full extraction and allocation pipeline for one bill
+    and returns a compact result, so the interpreter and imports are paid once
+    per worker instead of once per bill.
+
+    Args:
+        bill_dir: Directory containing PDF bills
+        jobs: Number of worker processes
+        output_path: Path of the combined CSV summary
+        overrides: Config keys set on the command line
+
+    Returns:
+        int: Exit code, 1 if any bill failed
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    yaml_data = read_config("configs.yml", overrides)
+    if not yaml_data:
+        print("Error: Could not read configs.yml")
+        return 1
+    # Bills are already spread over the pool; workers extract pages serially
+    yaml_data["page_jobs"] = 1
+
+    bill_paths = sorted(
+        path
+        for path in glob.glob(os.path.join(bill_dir, "*"))
+        if path.lower().endswith(".pdf")
+    )
+    if not bill_paths:
+        print(f"Error: No PDF bills found in {bill_dir}")
+        return 1
+
+    results = []
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(analyze_bill, path, yaml_data) for path in bill_paths
+        ]
+        for path, future in zip(bill_paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append((path, e))
+
+    write_batch_summary(results, output_path)
+    record_history(results, yaml_data)
+
+    print(f"\nT-Mobile Bill Batch Summary ({len(results)} bills)\n")
+    for result in results:
+        bill = os.path.basename(result.bill_path)
+        name = f"{result.bill_month or 'Unknown month'} ({bill})"
+        print(dot_line(name, result.total))
+    print(f"\nCombined summary saved to {output_path}")
+
+    for path, e in failures:
+        print(f"Error processing bill {path}: {e}")
+    return 1 if failures else 0
+
+
+def reallocate_history(history: BillHistory, yaml_data: dict) -> int:
+    """Recompute the member charges of every stored bill with the current config.
+
+    All bills are stacked and allocated at once by bill_matrix (NumPy, loaded
+    only here), then their member charges are replaced in one transaction.
+
+    Args:
+        history: Open bill history
+        yaml_data: Parsed configs.yml contents
+
+    Returns:
+        int: Exit code, 1 if no bill has stored summary table lines or the
+        re-allocated charges of a bill do not add up to its total
+    """
+    from bill_matrix import allocate_stack, member_charges, stack_bills
+
+    start = time.perf_counter()
+    bill_ids, bills, skipped = history.bill_lines()
+    if skipped:
+        print(f"Skipping {skipped} bill(s) recorded without summary table lines")
+    if not bill_ids:
+        print("Error: No bills with summary table lines to re-allocate")
+        return 1
+    stack = stack_bills(bills)
+    equal, tiered = allocate_stack(stack)
+    allocation = equal if yaml_data["plan_cost_for_all_members"] else tiered
+
+    # Same check as analyze_bill: the members must pay exactly the bill total
+    bill_totals = history.bill_totals()
+    allocated = allocation[:, :, -1].sum(axis=1).tolist()
+    mismatched = [
+        (bill_totals[bill_id], total)
+        for bill_id, total in zip(bill_ids, allocated)
+        if total != bill_totals[bill_id][1]
+    ]
+    if mismatched:
+        for (period, bill_total), total in mismatched:
+            logging.error(
+                f"Total bill does not match for {period}: {format_cents(total)} "
+                f"!= {format_cents(bill_total)}"
+            )
+        print(
+            f"Error: Re-allocated totals do not match {len(mismatched)} bill(s); "
+            "history left unchanged"
+        )
+        return 1
+
+    history.replace_member_charges(
+        bill_ids, member_charges(stack, allocation, load_member_names()), config_hash()
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Re-allocated {len(bill_ids)} bill(s) in {elapsed:.1f} ms")
+    return 0
+
+
+def run_history(args: argparse.Namespace) -> int:
+    """Print a member's bill history or everyone's year-to-date totals.
+
+    Args:
+        args: Parsed arguments from parse_history_args()
+
+    Returns:
+        int: Exit code, 1 if there is nothing recorded to show
+    """
+    yaml_data = read_yaml_file("configs.yml") or {}
+    history_path = args.db or yaml_data.get("history_path") or DEFAULT_HISTORY_PATH
+    if not os.path.exists(history_path):
+        print(f"Error: No bill history found at {history_path}")
+        return 1
+
+    with BillHistory(history_path) as history:
+        if args.reallocate:
+            return reallocate_history(history, yaml_data)
+        if args.member:
+            rows = history.member_history(args.member)
+            ytd = history.year_to_date(args.year, args.member)
+            if not rows:
+                print(f"Error: No bills recorded for {args.member}")
+                return 1
+            print(f"\nT-Mobile Bill History for {args.member}\n")
+            for period, bill_month, total, *_ in rows:
+                print(dot_line(f"{period or '?'} {bill_month}", total))
+            ytd_total = ytd[0][1] if ytd else 0
+            print(f"\n{dot_line(f'Year to date ({args.year})', ytd_total)}")
+        else:
+            ytd = history.year_to_date(args.year)
+            if not ytd:
+                print(f"Error: No bills recorded for {args.year}")
+                return 1
+            print(f"\nT-Mobile Year-to-Date Totals for {args.year}\n")
+            for member, total, *_ in ytd:
+                print(dot_line(member, total))
+            grand_total = sum(total for _, total, *_ in ytd)
+            print(f"\n{dot_line('Grand Total', grand_total)}")
+    return 0
+
+
+def open_cache(yaml_data: dict) -> BillCache:
+    """Return the result cache configured in configs.yml."""
+    return BillCache(
+        yaml_data.get("cache_dir", DEFAULT_CACHE_DIR),
+        yaml_data.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+    )
+
+
+def summarize_pdf(
+    source, yaml_data: dict, use_cache: bool = True, document: BillDocument = None
+) -> BillSummary:
+    """Process one bill, reusing the cached summary when it was seen before.
+
+    Args:
+        source: Path to the PDF bill, or its bytes
+        yaml_data: Parsed configs.yml contents
+        use_cache: Look up and store the result in the result cache
+        document: BillDocument already opened for source, passed to analyze_bill()
+
+    Returns:
+        BillSummary: Processed bill
     """
-    # Read bill month
+    if not use_cache:
+        return analyze_bill(source, yaml_data, reuse_history=False, document=document)
+
+    cache = open_cache(yaml_data)
+    with profile_stage("cache lookup"):
+        cache_key = cache.make_key(source)
+        cached = cache.get(cache_key)
+    if cached is not None:
+        return BillSummary.from_dict(cached)
+
+    summary = analyze_bill(source, yaml_data, document=document)
+    with profile_stage("cache store"):
+        cache.put(cache_key, summary.to_dict())
+    return summary
+
+
+def serve_bills(
+    socket_path: str, inherited_member_names=None, overrides: dict = None
+) -> None:
+    """Run the resident daemon that answers bill_client.py requests.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on
+        inherited_member_names: MEMBER_NAMES from the real environment, used
+            when .env does not define it
+        overrides: Config keys set on the command line
+    """
+    from bill_server import ConfigWatcher, serve
+
+    def handle(source, yaml_data, no_cache):
+        summary = summarize_pdf(source, yaml_data, not no_cache)
+        record_history([summary], yaml_data)
+        return format_bill_summary(summary)
+
+    watcher = ConfigWatcher(
+        functools.partial(read_config, overrides=overrides),
+        "configs.yml",
+        ".env",
+        inherited_member_names,
+    )
+    serve(handle, watcher, socket_path)
+
+
+def watch_summary_path(pdf_path: str) -> str:
+    """Return where watch mode writes a bill's summary: next to the PDF."""
+    return f"{os.path.splitext(pdf_path)[0]}_summary.csv"
+
+
+def process_dropped_bill(pdf_path: str, yaml_data: dict, member_names: str):
+    """Watch mode pool worker: run the pipeline for one bill.
+
+    Pool workers outlive .env reloads in the parent, so the parent's current
+    MEMBER_NAMES is passed along with each bill.
+    """
+    if member_names is None:
+        os.environ.pop("MEMBER_NAMES", None)
+    else:
+        os.environ["MEMBER_NAMES"] = member_names
+    return analyze_bill(pdf_path, yaml_data)
+
+
+def run_watch(args: argparse.Namespace, inherited_member_names: str) -> int:
+    """Process PDF bills dropped into a folder until interrupted.
+
+    Each new bill's summary is written to <name>_summary.csv next to it,
+    recorded in the history and printed. Bills whose summary is newer than
+    the PDF are treated as already processed.
+
+    Args:
+        args: Parsed arguments from parse_watch_args()
+        inherited_member_names: MEMBER_NAMES from the environment before .env
+
+    Returns:
+        int: Exit code, 1 if the folder does not exist
+    """
+    import asyncio
+
+    from bill_server import ConfigWatcher
+    from bill_watch import watch
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: No such folder: {args.directory}")
+        return 1
+    watcher = ConfigWatcher(read_config, "configs.yml", ".env", inherited_member_names)
+
+    def make_job(pdf_path):
+        yaml_data = watcher.current()
+        if not yaml_data:
+            raise ValueError("could not read configs.yml")
+        # Bills are spread over the pool; workers extract pages serially
+        yaml_data = dict(yaml_data, page_jobs=1)
+        return functools.partial(
+            process_dropped_bill, pdf_path, yaml_data, os.environ.get("MEMBER_NAMES")
+        )
+
+    def finish(pdf_path, summary, error):
+        if error is None:
+            try:
+                write_batch_summary([summary], watch_summary_path(pdf_path))
+                record_history([summary], watcher.current())
+            except Exception as e:
+                error = e
+        if error is not None:
+            print(f"Error processing bill {pdf_path}: {error}", flush=True)
+            return
+        name = f"{summary.bill_month or 'Unknown month'} ({os.path.basename(pdf_path)})"
+        print(dot_line(name, summary.total), flush=True)
+
+    def is_processed(pdf_path):
+        try:
+            summary_mtime = os.path.getmtime(watch_summary_path(pdf_path))
+        except OSError:
+            return False
+        return summary_mtime >= os.path.getmtime(pdf_path)
+
     try:
-        with open(bill_month_file, "r") as f:
-            bill_month = f.read().strip()
-            if not bill_month:
-                bill_month = "last month"
-    except FileNotFoundError:
-        bill_month = "last month"
+        asyncio.run(
+            watch(
+                args.directory,
+                make_job,
+                finish,
+                args.jobs,
+                args.poll_interval,
+                args.settle,
+                is_processed,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
 
-    # Read and format the summary
-    df = pd.read_csv(summary_csv_path)
+def positive_int(value) -> int:
+    """argparse type for worker counts: an integer of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
-    # Format currency columns
-    currency_cols = ["total", "plan_price", "equipment", "services", "one_time_charges"]
-    for col in currency_cols:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: f"${x:,.2f}")
 
-    # Select only Member and Total columns for output
-    output_df = df[["member", "total"]].copy()
+def parse_watch_args(argv=None) -> argparse.Namespace:
+    """Parse the arguments of the watch subcommand."""
+    from bill_watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_TIME
 
-    # Calculate grand total
-    grand_total = df["total"].replace(r"[\$,]", "", regex=True).astype(float).sum()
+    parser = argparse.ArgumentParser(
+        prog="main.py watch",
+        description="Process PDF bills as they are dropped into a folder.",
+    )
+    parser.add_argument("directory", help="Drop folder to watch")
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        default=os.cpu_count(),
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between folder scans (default: {DEFAULT_POLL_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=DEFAULT_SETTLE_TIME,
+        metavar="SECONDS",
+        help="Seconds a PDF must stay unchanged before it is processed "
+        f"(default: {DEFAULT_SETTLE_TIME:g})",
+    )
+    return parser.parse_args(argv)
 
-    # Print header
-    print(f"\nT-Mobile Bill Summary for {bill_month}\n")
 
-    # Print formatted rows with dot leaders for readability
-    max_name_length = output_df["member"].str.len().max()
-    total_width = max(max_name_length + 20, 40)  # Ensure minimum width
+def parse_history_args(argv=None) -> argparse.Namespace:
+    """Parse the arguments of the history subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="main.py history",
+        description="Query the bill history recorded by previous runs.",
+    )
+    parser.add_argument(
+        "--member", help="Show this member's charges per bill and year to date"
+    )
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=datetime.date.today().year,
+        help="Year for year-to-date totals (default: current year)",
+    )
+    parser.add_argument(
+        "--db", help="History database (default: history_path from configs.yml)"
+    )
+    parser.add_argument(
+        "--reallocate",
+        action="store_true",
+        help="Recompute every stored bill's member charges with the current "
+        "configs.yml and MEMBER_NAMES",
+    )
+    return parser.parse_args(argv)
 
-    for _, row in output_df.iterrows():
-        name = row["member"]
-        total = row["total"]
-        # Add dot leaders between name and price
-        dots_needed = total_width - len(name) - len(total)
-        dots = "." * (max(dots_needed, 2) - 15)
-        print(f"{name} {dots} {total}")
 
-    # Print grand total
-    print(f"\n{'Grand Total'} {'.' * (total_width - len('Grand Total') - len(f'${grand_total:,.2f}') - 15)} ${grand_total:,.2f}")
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Parse T-Mobile PDF bills and split costs among family members."
+    )
+    parser.add_argument(
+        "pdf_path", nargs="?", help="Path to the PDF bill, or - to read it from stdin"
+    )
+    parser.add_argument(
+        "--batch", metavar="DIR", help="Process every PDF bill in DIR"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        default=os.cpu_count(),
+        help="Number of worker processes for --batch (default: CPU count)",
+    )
+    parser.add_argument(
+        "--output",
+        help="Combined CSV summary for --batch (default: DIR/batch_summary.csv)",
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help="Run the pandas pipeline and write the CSV exports to a new folder "
+        "under attachments/",
+    )
+    parser.add_argument(
+        "--export-dir",
+        metavar="DIR",
+        help="Write the --export files to DIR instead of a new per-run folder",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-process the bill even if a cached summary exists",
+    )
+    parser.add_argument(
+        "--details",
+        action="store_true",
+        help="Also print the DETAILED CHARGES section itemized per line",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a resident daemon answering bill_client.py requests",
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET_PATH,
+        help=f"Unix socket for --serve (default: {DEFAULT_SOCKET_PATH})",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=TEXT_ENGINES,
+        help="Page text engine: pypdf's extract_text() or the faster raw "
+        "content-stream scanner (default: text_engine in configs.yml)",
+    )
+    parser.add_argument(
+        "--page-jobs",
+        type=int,
+        metavar="N",
+        help="Extract the pages of long statements in N worker processes "
+        "(default: page_jobs in configs.yml)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall time and tracemalloc peak per stage on stderr",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["table", "json"],
+        default="table",
+        help="Print the --profile report as a table or as JSON lines",
+    )
+    return parser.parse_args(argv)
 
 
 def main() -> None:
     """Main entry point for bill processing."""
 
     # Load environment variables from .env file (for name mappings)
+    inherited_member_names = os.environ.get("MEMBER_NAMES")
     load_dotenv()
 
+    if sys.argv[1:2] == ["history"]:
+        sys.exit(run_history(parse_history_args(sys.argv[2:])))
+    if sys.argv[1:2] == ["watch"]:
+        sys.exit(run_watch(parse_watch_args(sys.argv[2:]), inherited_member_names))
+
+    args = parse_args()
+
+    if args.serve:
+        serve_bills(args.socket, inherited_member_names, config_overrides(args))
+        return
+
+    if args.batch:
+        output_path = args.output or os.path.join(args.batch, "batch_summary.csv")
+        sys.exit(
+            run_batch(args.batch, args.jobs, output_path, config_overrides(args))
+        )
+
     # Validate arguments
-    if len(sys.argv) < 2:
+    if not args.pdf_path:
         print("Error: Please provide a PDF file path")
         print("Usage: python main.py /path/to/bill.pdf")
         sys.exit(1)
 
-    pdf_path = sys.argv[1]
+    pdf_path = args.pdf_path
+    if pdf_path == "-":
+        # Share Sheet input piped in: no temporary copy of the PDF on disk
+        pdf_path = sys.stdin.buffer.read()
+        if not pdf_path:
+            print("Error: No PDF data on stdin")
+            sys.exit(1)
+    profiler = enable_profiling() if args.profile else None
 
     try:
-        # Process the PDF bill
-        analyze_bill_text(pdf_path=pdf_path)
+        yaml_data = read_config("configs.yml", config_overrides(args))
+        if not yaml_data:
+            print("Error: Could not read configs.yml")
+            sys.exit(1)
+
+        # --details reads the same PDF: open it once for both stages
+        document = None
+        if args.details:
+            document = BillDocument(
+                pdf_path,
+                yaml_data.get("text_engine", "pypdf"),
+                yaml_data.get("page_jobs", 1),
+            )
+
+        if args.export:
+            # pandas pipeline, which also writes the CSV exports
+            from analyze_bill_text import main as analyze_bill_text, make_run_dir
+
+            run_dir = args.export_dir or make_run_dir(
+                os.path.dirname(yaml_data["summarized_bill_path"])
+            )
+            os.makedirs(run_dir, exist_ok=True)
+            summary = analyze_bill_text(
+                pdf_path=pdf_path,
+                run_dir=run_dir,
+                text_engine=yaml_data.get("text_engine"),
+                page_jobs=yaml_data.get("page_jobs"),
+                document=document,
+            )
+            if summary is None:
+                print("Error: Could not read configs.yml")
+                sys.exit(1)
+            print(f"Exports saved to {run_dir}", file=sys.stderr)
+            if not args.no_cache:
+                cache = open_cache(yaml_data)
+                with profile_stage("cache store"):
+                    cache.put(cache.make_key(pdf_path), summary.to_dict())
+        else:
+            summary = summarize_pdf(
+                pdf_path, yaml_data, use_cache=not args.no_cache, document=document
+            )
 
-        # Print formatted output
-        print_bill_summary("attachments/summary.csv")
+        print_bill_summary(summary)
+        if args.details:
+            print_detailed_charges(document, yaml_data)
+        record_history([summary], yaml_data)
 
     except FileNotFoundError:
-        print(f"Error: PDF file not found: {pdf_path}")
+        print(f"Error: PDF file not found: {args.pdf_path}")
         sys.exit(1)
     except Exception as e:
         print(f"Error processing bill: {e}")
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.report(args.profile_format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""BillHistory with several lines mapped to the same member name."""
+
+import pytest
+
+from bill_engine import BillLine, BillSummary, allocate_charges
+from bill_history import BillHistory, bill_period
+
+# a phone and a watch of the same member
+MEMBER_NAMES = {"(555) 555-0101": "Alice", "(555) 555-0102": "Alice"}
+CONFIG_HASH = "test-config"
+
+
+def _summary(month="January", issue_date="2025-01-25"):
+    lines = [
+        BillLine("Account", "", 10000, 0, 300, 0, 10300),
+        BillLine("(555) 555-0101", "Voice", 0, 2125, 0, 53, 2178, included=True),
+        BillLine("(555) 555-0102", "Wearable", 0, 0, 0, 0, 0, included=True),
+        BillLine("(555) 555-0103", "Tablet", 2000, 0, 0, 0, 2000),
+    ]
+    members = allocate_charges(lines, True, MEMBER_NAMES)
+    total = sum(line.total for line in lines)
+    return BillSummary("bill.pdf", month, total, members, issue_date, lines)
+
+
+@pytest.fixture
+def history(tmp_path):
+    with BillHistory(str(tmp_path / "history.sqlite3")) as history:
+        yield history
+
+
+def test_record_sums_lines_of_the_same_member(history):
+    summary = _summary()
+    period = history.record(summary, CONFIG_HASH)
+    assert period == "2025-01"
+
+    alice = [m for m in summary.members if m.member == "Alice"]
+    assert len(alice) == 2
+    expected = tuple(
+        sum(getattr(m, f) for m in alice)
+        for f in ["total", "plan_price", "equipment", "services", "one_time_charges"]
+    )
+    assert history.member_history("Alice") == [("2025-01", "January", *expected)]
+    assert history.year_to_date(2025, "Alice") == [("Alice", *expected)]
+    assert sum(row[1] for row in history.year_to_date(2025)) == summary.total
+
+
+def test_record_replaces_the_same_period(history):
+    history.record(_summary(), CONFIG_HASH)
+    history.record(_summary(), CONFIG_HASH)
+    assert len(history.member_history("Alice")) == 1
+
+
+def test_processed_bill_round_trips_members_and_lines(history):
+    summary = _summary()
+    history.record(summary, CONFIG_HASH)
+    period = bill_period(summary.bill_month, summary.issue_date)
+
+    stored = history.processed_bill(period, summary.total, CONFIG_HASH)
+    assert stored == summary
+    assert history.processed_bill(period, summary.total, "other-config") is None
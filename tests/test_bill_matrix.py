@@ -0,0 +1,73 @@
+"""bill_matrix must allocate stacked bills exactly like allocate_charges().
+
+The bills are chosen so the leftover cents fall on different lines: amounts
+that do not divide evenly, negative credits, bills with different numbers of
+lines, and tiered bills with none, some or all lines included.
+"""
+
+import pytest
+
+from bill_engine import BillLine, allocate_charges
+from bill_matrix import allocate_stack, member_charges, stack_bills
+
+MEMBER_NAMES = {"(555) 555-0101": "Alice", "(555) 555-0102": "Bob"}
+
+
+def _bill(account, members):
+    """BillLine rows of one bill from (plans, equipment, services, one_time)."""
+    lines = [BillLine("Account", "", *account, sum(account))]
+    for i, (charges, included) in enumerate(members, start=1):
+        cell_num = f"(555) 555-01{i:02d}"
+        lines.append(BillLine(cell_num, "Voice", *charges, sum(charges), included))
+    return lines
+
+
+BILLS = [
+    # uneven remainders on every shared column
+    _bill(
+        (10001, 2503, 707, 1),
+        [((0, 0, 0, 0), True), ((3500, 2917, 0, 0), True), ((0, 0, 199, 0), False)],
+    ),
+    # negative account credits and a negative line
+    _bill(
+        (-2999, -1001, 5, -7),
+        [((2000, 0, 0, 0), False), ((-500, 833, -12, 0), True)],
+    ),
+    # more lines than any other bill, none included
+    _bill(
+        (9000, 0, 1234, 2),
+        [((1000 * i, i, 0, 0), False) for i in range(7)],
+    ),
+    # a single line
+    _bill((4999, 1, 0, 0), [((0, 0, 0, 0), True)]),
+    # every line included
+    _bill(
+        (17777, 0, 0, 0),
+        [((0, 0, 0, 0), True) for _ in range(6)],
+    ),
+]
+
+
+@pytest.mark.parametrize("plan_cost_for_all_members", [True, False])
+def test_allocate_stack_matches_allocate_charges(plan_cost_for_all_members):
+    stack = stack_bills(BILLS)
+    equal, tiered = allocate_stack(stack)
+    allocation = equal if plan_cost_for_all_members else tiered
+
+    stacked = member_charges(stack, allocation, MEMBER_NAMES)
+    expected = [
+        allocate_charges(lines, plan_cost_for_all_members, MEMBER_NAMES)
+        for lines in BILLS
+    ]
+    assert stacked == expected
+
+
+def test_equal_split_adds_up_to_bill_totals():
+    equal, _ = allocate_stack(stack_bills(BILLS))
+    totals = [sum(line.total for line in lines) for lines in BILLS]
+    assert equal[:, :, -1].sum(axis=1).tolist() == totals
+
+
+def test_stack_bills_rejects_bill_without_members():
+    with pytest.raises(ValueError):
+        stack_bills([BILLS[0], _bill((100, 0, 0, 0), [])])
@@ -0,0 +1,25 @@
+"""Command-line argument checks that must fail before any work starts."""
+
+import pytest
+
+from main import parse_args, parse_watch_args
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "x"])
+def test_batch_rejects_jobs_below_one(jobs, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(["--batch", "bills", "--jobs", jobs])
+    assert exit_info.value.code == 2
+    assert "--jobs" in capsys.readouterr().err
+
+
+def test_batch_accepts_positive_jobs():
+    assert parse_args(["--batch", "bills", "--jobs", "3"]).jobs == 3
+
+
+@pytest.mark.parametrize("jobs", ["0", "-1"])
+def test_watch_rejects_jobs_below_one(jobs, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_watch_args(["bills", "--jobs", jobs])
+    assert exit_info.value.code == 2
+    assert "--jobs" in capsys.readouterr().err
@@ -0,0 +1,81 @@
+"""normalize_currency_column must convert cells exactly like get_cents_from_str."""
+
+import random
+
+import pandas as pd
+import pytest
+
+from analyze_bill_text import normalize_currency_column
+from bill_engine import get_cents_from_str
+
+CELLS = [
+    "$40.00",
+    "-$21.25",
+    "$0.53",
+    "$0.005",  # a third decimal rounds half away from zero
+    "-$0.005",
+    "$0.004",
+    "$0.999",
+    "-$1.995",
+    "$12.5",
+    "$7",
+    "$1,234.56",
+    "-$1,234,567.89",
+    "+$3.00",
+    "+12.34",
+    "-0.10",
+    "  $3.41",  # padded by the table layout
+    "$5.00  ",
+    " -$2.50 ",
+]
+
+
+def _expected(cells):
+    cents, included = [], []
+    for cell in cells:
+        value = get_cents_from_str(cell)
+        included.append(value == "Included")
+        cents.append(0 if value == "Included" else value)
+    return cents, included
+
+
+def _check(cells):
+    cents, included = normalize_currency_column(pd.Series(cells))
+    expected_cents, expected_included = _expected(cells)
+    assert cents.tolist() == expected_cents
+    assert included.tolist() == expected_included
+    assert cents.dtype == "int64"
+
+
+def test_matches_get_cents_from_str():
+    _check(CELLS)
+
+
+def test_included_and_no_charge():
+    _check(["Included", "-", "$1.00", "Included", "-"])
+    cents, included = normalize_currency_column(pd.Series(["Included", "-"]))
+    assert cents.tolist() == [0, 0]
+    assert included.tolist() == [True, False]
+
+
+def test_keeps_the_index():
+    column = pd.Series(["$1.00", "-"], index=[7, 3])
+    cents, included = normalize_currency_column(column)
+    assert cents.index.tolist() == [7, 3]
+    assert included.index.tolist() == [7, 3]
+
+
+def test_matches_random_amounts():
+    rng = random.Random(0)
+    cells = []
+    for _ in range(5000):
+        amount = rng.randint(0, 10**9)
+        cell = f"{amount // 1000:,}.{amount % 1000:03d}"[: rng.choice([-1, None])]
+        cells.append(rng.choice(["", "-", "+"]) + rng.choice(["", "$"]) + cell)
+    _check(cells)
+
+
+@pytest.mark.parametrize("cell", ["$1.2.3", "abc", "$", "12a"])
+def test_rejects_non_amounts(cell):
+    with pytest.raises(ValueError):
+        normalize_currency_column(pd.Series(["$1.00", cell]))
@@ -0,0 +1,46 @@
+"""Import-time budget for the single-bill fast path.
+
+main.py must start without pandas or numpy (see bill_engine), since their
+import dominates a run on a-Shell. Each check runs in a fresh interpreter.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importing main took ~0.19s without pandas and ~0.54s with it when measured
+IMPORT_BUDGET_SECONDS = 0.5
+HEAVY_MODULES = ["pandas", "numpy"]
+
+_PROBE = (
+    "import json, sys, time; t = time.perf_counter(); import main; "
+    "elapsed = time.perf_counter() - t; "
+    f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))"
+)
+
+
+def _import_main():
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_import_skips_pandas_and_numpy():
+    _, loaded = _import_main()
+    assert loaded == []
+
+
+def test_import_stays_under_budget():
+    # best of three, so a busy machine does not fail the check
+    elapsed = min(_import_main()[0] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, (
+        f"import main took {elapsed:.3f}s, budget {IMPORT_BUDGET_SECONDS}s"
+    )
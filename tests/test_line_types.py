@@ -0,0 +1,67 @@
+"""The default engine and the --export pipeline must parse the same rows.
+
+Both read the summary table with parse_summary_table(), so a line type other
+than Voice (which the general parser accepts) is allocated by both.
+"""
+
+import os
+import sys
+
+import yaml
+
+from bill_engine import analyze_bill
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+
+from synthetic_bill import build_pdf, generate_bill_pages  # noqa: E402
+
+MEMBERS = 10
+NON_VOICE_LINE = "(999) 100-0009"
+
+
+def _write_bill(directory):
+    """Write a synthetic bill whose last line is a Mobile Internet line."""
+    pages, total = generate_bill_pages(MEMBERS)
+    row_start = f"{NON_VOICE_LINE} Voice "
+    for page in pages:
+        for i, line in enumerate(page):
+            if line.startswith(row_start):
+                page[i] = line.replace(" Voice ", " Mobile Internet ", 1)
+    path = os.path.join(directory, "bill.pdf")
+    with open(path, "wb") as f:
+        f.write(build_pdf(pages))
+    return path, total
+
+
+def _yaml_data(directory):
+    return {
+        "family_count": MEMBERS,
+        "plan_cost_for_all_members": True,
+        "page_number": 1,
+        "summarized_bill_path": os.path.join(directory, "summary.csv"),
+        "layout_memory_path": os.path.join(directory, ".bill_layouts.json"),
+        "history_path": "",
+    }
+
+
+def test_export_pipeline_matches_engine_on_non_voice_line(tmp_path, monkeypatch):
+    monkeypatch.delenv("MEMBER_NAMES", raising=False)
+    monkeypatch.chdir(tmp_path)
+    pdf_path, total = _write_bill(str(tmp_path))
+    yaml_data = _yaml_data(str(tmp_path))
+    with open("configs.yml", "w") as f:
+        yaml.safe_dump(yaml_data, f)
+
+    summary = analyze_bill(pdf_path, yaml_data, reuse_history=False)
+    assert summary.total == total
+    assert {line.cell_num: str(line.line_type) for line in summary.lines}[
+        NON_VOICE_LINE
+    ] == "Mobile Internet"
+
+    from analyze_bill_text import main as analyze_bill_text
+
+    exported = analyze_bill_text(pdf_path=pdf_path, save_outputs=False)
+    assert exported.total == total
+    assert exported.members == summary.members
+    assert exported.lines == summary.lines